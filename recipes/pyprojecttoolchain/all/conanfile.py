@@ -1,5 +1,9 @@
+import hashlib
 import textwrap
+import time
+from functools import cached_property, lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from jinja2 import Template
 
@@ -8,13 +12,108 @@ from conan.tools.microsoft import VCVars
 from conan.tools.cmake.toolchain.blocks import Block
 from conan.tools.cmake.toolchain.toolchain import ToolchainBlocks
 from conan.tools.gnu.autotoolstoolchain import AutotoolsToolchain
-from conan.tools.files import save
+from conan.tools.files import load, save
 from conan.errors import ConanInvalidConfiguration
 from conan.tools.scm import Version
-from conan.tools import CppInfo
 
 
-class BuildSystemBlock(Block):
+@lru_cache(maxsize = None)
+def _compile_template(template: str) -> Template:
+    """ Compiles a block template once per process, instead of once per rendering """
+    return Template(template, trim_blocks = True, lstrip_blocks = True)
+
+
+class AggregatedCppInfo(object):
+    """
+    The cpp_info of a list of dependencies merged into one, every list keeps the first occurrence of each value
+
+    Merging the cpp_info objects of a big graph one by one compares every value against the whole merged list, while the
+    index only keeps track of which values it already has.
+    """
+    fields = ("includedirs", "libdirs", "bindirs", "libs", "system_libs", "frameworkdirs", "frameworks", "defines",
+              "cflags", "cxxflags", "sharedlinkflags", "exelinkflags")
+    __slots__ = fields
+
+    def __init__(self, cpp_infos):
+        index = {field: {} for field in self.fields}
+        for cpp_info in cpp_infos:
+            for field in self.fields:
+                index[field].update(dict.fromkeys(getattr(cpp_info, field, None) or []))
+        for field in self.fields:
+            setattr(self, field, list(index[field]))
+
+
+# The aggregated cpp_info of the host dependencies by graph hash, shared by all toolchains in the Conan process
+_aggregated_cpp_infos: Dict[str, AggregatedCppInfo] = {}
+
+
+class DependencyData(object):
+    """
+    The data of the dependency graph that the pyproject.toml blocks are rendered from
+
+    It is looked up once and shared by all blocks of a toolchain. A precomputed instance can be passed to the
+    PyProjectToolchain, so that recipes creating multiple toolchains, or with big dependency graphs, only collect it once.
+    """
+
+    def __init__(self, conanfile: ConanFile):
+        self._conanfile = conanfile
+
+    @cached_property
+    def cpython(self):
+        """ The cpython dependency, None if there isn't one """
+        try:
+            return self._conanfile.dependencies["cpython"]
+        except Exception:
+            return None
+
+    @property
+    def python_version(self) -> Optional[str]:
+        return str(self.cpython.ref.version) if self.cpython is not None else None
+
+    @cached_property
+    def python_cpp_info(self):
+        """ The cpp_info of the python component of the cpython dependency, None if there isn't one """
+        try:
+            return self.cpython.cpp_info.components["python"]
+        except Exception:
+            return None
+
+    @cached_property
+    def _host_dependencies(self) -> List:
+        deps = self._conanfile.dependencies.host.topological_sort
+        return [dep for dep in reversed(deps.values())]
+
+    @cached_property
+    def graph_hash(self) -> str:
+        """ Hash over the package references of the host dependencies, in order """
+        digest = hashlib.sha256()
+        for dep in self._host_dependencies:
+            digest.update(f"{getattr(dep, 'pref', dep.ref)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def cpp_info(self) -> AggregatedCppInfo:
+        """ The cpp_info of all host dependencies, aggregated in topological order without duplicates """
+        aggregated_cpp_info = _aggregated_cpp_infos.get(self.graph_hash)
+        if aggregated_cpp_info is None:
+            aggregated_cpp_info = AggregatedCppInfo(dep.cpp_info.aggregated_components() for dep in self._host_dependencies)
+            _aggregated_cpp_infos[self.graph_hash] = aggregated_cpp_info
+        return aggregated_cpp_info
+
+
+class PyProjectBlock(Block):
+    """ Block rendering the same content as the Conan Block does, with its template compiled once per process """
+
+    def get_rendered_content(self):
+        context = self.values
+        if context is None:
+            return
+
+        template = f"########## '{self._name}' block #############\n" + self.template + "\n\n"
+        return _compile_template(template).render(**context)
+
+
+class BuildSystemBlock(PyProjectBlock):
     template = textwrap.dedent("""
     [build-system]
     requires = [{{ build_requires }}]
@@ -31,7 +130,7 @@ class BuildSystemBlock(Block):
         return {"build_requires": build_requires, "build_backend": build_backend}
 
 
-class ToolSipMetadataBlock(Block):
+class ToolSipMetadataBlock(PyProjectBlock):
     template = textwrap.dedent("""
     [tool.sip.metadata]
     name = "{{ name }}"
@@ -47,9 +146,8 @@ class ToolSipMetadataBlock(Block):
     def context(self):
         python_version = self._conanfile.options.get_safe("py_version")
         if python_version is None:
-            try:
-                python_version = self._conanfile.dependencies["cpython"].ref.version
-            except:
+            python_version = self._toolchain.dependency_data.python_version
+            if python_version is None:
                 raise ConanInvalidConfiguration(
                     "No minimum required Python version specified, either add the options: 'py_version' of add cpython as a Conan dependency!")
 
@@ -74,7 +172,7 @@ class ToolSipMetadataBlock(Block):
         }
 
 
-class ToolSipProjectPyQtBuilder(Block):
+class ToolSipProjectPyQtBuilder(PyProjectBlock):
     template = textwrap.dedent("""
     {% if link_full_dll %}link-full-dll = true
     {% endif %}py-pylib-dir = "{{ py_pylib_dir }}"
@@ -89,9 +187,9 @@ class ToolSipProjectPyQtBuilder(Block):
 
         if py_lib_dir is None:
             try:
-                cpython_cpp = self._conanfile.dependencies["cpython"].cpp_info
-                py_lib_dir = Path(cpython_cpp.components["python"].libdirs[0]).as_posix()
-                py_lib = cpython_cpp.components["python"].libs[0]
+                python_cpp_info = self._toolchain.dependency_data.python_cpp_info
+                py_lib_dir = Path(python_cpp_info.libdirs[0]).as_posix()
+                py_lib = python_cpp_info.libs[0]
             except:
                 self._conanfile.output.warning(
                     "No include directory set for Python.h, either add the options: 'py_include' of add cpython as a Conan dependency!")
@@ -107,7 +205,7 @@ class ToolSipProjectPyQtBuilder(Block):
         }
 
 
-class ToolSipProjectBlock(Block):
+class ToolSipProjectBlock(PyProjectBlock):
     template = textwrap.dedent("""
     [tool.sip.project]
     compile = {{ compile | lower }}
@@ -126,9 +224,8 @@ class ToolSipProjectBlock(Block):
         py_minor_version = None
 
         if python_version is None:
-            try:
-                python_version = self._conanfile.dependencies["cpython"].ref.version
-            except:
+            python_version = self._toolchain.dependency_data.python_version
+            if python_version is None:
                 self._conanfile.output.warning(
                     "No minimum required Python version specified, either add the options: 'py_version' of add cpython as a Conan dependency!")
 
@@ -138,8 +235,8 @@ class ToolSipProjectBlock(Block):
             if py_include_dir is None:
                 try:
                     header_path = "" if self._conanfile.settings.os == "Windows" else f"python{py_version.major}.{py_version.minor}"
-                    cpython_cpp = self._conanfile.dependencies["cpython"].cpp_info
-                    py_include_dir = Path(cpython_cpp.components["python"].includedirs[0], header_path).as_posix()
+                    python_cpp_info = self._toolchain.dependency_data.python_cpp_info
+                    py_include_dir = Path(python_cpp_info.includedirs[0], header_path).as_posix()
                     py_include_dir = f"py-include-dir = \"{py_include_dir}\""
                 except:
                     self._conanfile.output.warning(
@@ -160,7 +257,7 @@ class ToolSipProjectBlock(Block):
         build_folder = str(Path(self._conanfile.build_folder).joinpath("sip").as_posix())
         return {
             "sip_files_dir": sip_files_dir,
-            "compile": False,
+            "compile": self._conanfile.options.get_safe("py_sip_compile", False),
             "build_folder": build_folder,
             "package_folder": package_folder,
             "py_include_dir": py_include_dir,
@@ -169,7 +266,7 @@ class ToolSipProjectBlock(Block):
         }
 
 
-class ToolSipBindingsExtraSourcesBlock(Block):
+class ToolSipBindingsExtraSourcesBlock(PyProjectBlock):
     template = textwrap.dedent("""
     headers = {{ headers }}
     sources = {{ sources }}
@@ -182,7 +279,7 @@ class ToolSipBindingsExtraSourcesBlock(Block):
         }
 
 
-class ToolSipBindingBlockCompile(Block):
+class ToolSipBindingBlockCompile(PyProjectBlock):
     template = textwrap.dedent("""
     extra-compile-args = {{ compileargs }}
     extra-link-args = {{ linkargs }}
@@ -195,7 +292,7 @@ class ToolSipBindingBlockCompile(Block):
         }
 
 
-class ToolSipBindingsBlock(Block):
+class ToolSipBindingsBlock(PyProjectBlock):
     template = textwrap.dedent("""
     [tool.sip.bindings.{{ name }}]
     exceptions = true
@@ -210,21 +307,16 @@ class ToolSipBindingsBlock(Block):
 
     def context(self):
         settings = self._conanfile.settings
-        aggregated_cpp_info = CppInfo(self._conanfile)
-        deps = self._conanfile.dependencies.host.topological_sort
-        deps = [dep for dep in reversed(deps.values())]
-        for dep in deps:
-            dep_cppinfo = dep.cpp_info.aggregated_components()
-            aggregated_cpp_info.merge(dep_cppinfo)
+        aggregated_cpp_info = self._toolchain.dependency_data.cpp_info
 
         build_type = settings.get_safe("build_type", "Release")
         shared = settings.get_safe("shared", True)
 
         libs = aggregated_cpp_info.libs
-        libdirs = [Path(d).as_posix() for d in aggregated_cpp_info.libdirs]
-        includedirs = [Path(d).as_posix() for d in aggregated_cpp_info.includedirs]
+        libdirs = list(dict.fromkeys(Path(d).as_posix() for d in aggregated_cpp_info.libdirs))
+        includedirs = list(dict.fromkeys(Path(d).as_posix() for d in aggregated_cpp_info.includedirs))
         if self._conanfile.cpp.source.includedirs:
-            includedirs.extend(self._conanfile.cpp.source.includedirs)
+            includedirs.extend(d for d in self._conanfile.cpp.source.includedirs if d not in includedirs)
 
         return {
             "name": self._conanfile.name,
@@ -238,6 +330,8 @@ class ToolSipBindingsBlock(Block):
 
 class PyProjectToolchain(AutotoolsToolchain):
     _pyproject_filename = Path("pyproject.toml")
+    # Fingerprint of the inputs of sip-build, the SipBuildTool skips the build when it didn't change since its last run
+    _fingerprint_filename = Path("pyproject.fingerprint")
 
     _pyproject_template = textwrap.dedent("""
     # Conan automatically generated pyproject.toml file
@@ -247,8 +341,10 @@ class PyProjectToolchain(AutotoolsToolchain):
     {% endfor %}
     """)
 
-    def __init__(self, conanfile: ConanFile, namespace = None):
+    def __init__(self, conanfile: ConanFile, namespace = None, dependency_data: Optional[DependencyData] = None):
         super().__init__(conanfile, namespace)
+        self.dependency_data = dependency_data or DependencyData(self._conanfile)
+        self._rendered_blocks = None
 
         blocks = [
             ("build_system", BuildSystemBlock),
@@ -267,23 +363,65 @@ class PyProjectToolchain(AutotoolsToolchain):
 
     @property
     def _context(self):
-        blocks = self.blocks.process_blocks()
-        print(blocks)
-        return {"conan_blocks": blocks}
+        # The blocks are rendered once, customize the blocks before accessing the content
+        if self._rendered_blocks is None:
+            self._rendered_blocks = self.blocks.process_blocks()
+        return {"conan_blocks": self._rendered_blocks}
 
     @property
     def content(self):
-        content = Template(self._pyproject_template, trim_blocks = True, lstrip_blocks = True).render(**self._context)
+        content = _compile_template(self._pyproject_template).render(**self._context)
         return content
 
     def generate(self, env = None, scope = "build"):
+        start = time.time()
         env = env or self.environment()
         env = env.vars(self._conanfile, scope = scope)
         env.save_script("conanpyprojecttoolchain")
         VCVars(self._conanfile).generate(scope = scope)
 
+        # Only write the files when their content changed, so their timestamps don't trigger rebuilds
+        content = self.content
         py_project_filename = Path(self._conanfile.source_folder, self._pyproject_filename)
-        save(self._conanfile, py_project_filename, self.content)
+        self._save_if_changed(py_project_filename, content)
+        self._save_if_changed(Path(self._conanfile.build_folder, self._fingerprint_filename), self.fingerprint(content))
+
+        # The profile of the sip build is owned by the sipbuildtool, a profiled run starts with this generation
+        if self._conanfile.conf.get("user.sipbuildtool:profile", default = False, check_type = bool):
+            sipbuildtool = self._sipbuildtool_module()
+            if sipbuildtool is None:
+                self._conanfile.output.warning(
+                    "The conf 'user.sipbuildtool:profile' is set, but the sipbuildtool isn't a python_requires of this recipe, not profiling")
+                return
+            events_path = sipbuildtool.start_profile(self._conanfile)
+            sipbuildtool.record_profile_event(events_path, str(self._pyproject_filename), "pyproject", start, time.time() - start)
+
+    def _sipbuildtool_module(self):
+        # Without python_requires the attribute is still the declared value, which has no items()
+        python_requires = getattr(self._conanfile, "python_requires", None)
+        if not hasattr(python_requires, "items"):
+            return None
+        sipbuildtool = dict(python_requires.items()).get("sipbuildtool")
+        return None if sipbuildtool is None else sipbuildtool.module
+
+    def _save_if_changed(self, path: Path, content: str) -> None:
+        if path.exists() and load(self._conanfile, path) == content:
+            self._conanfile.output.info(f"{path.name} is up to date")
+            return
+        save(self._conanfile, path, content)
+
+    def fingerprint(self, content: str) -> str:
+        """ Hash over the pyproject.toml content, the sip files of the project and the package references of the host
+        dependencies """
+        digest = hashlib.sha256(content.encode("utf-8"))
+        sip_files_dir = Path(self._conanfile.source_folder, self._conanfile.name)
+        if sip_files_dir.is_dir():
+            for path in sorted(sip_files_dir.rglob("*")):
+                if path.is_file():
+                    digest.update(f"{path.relative_to(sip_files_dir).as_posix()}\0".encode("utf-8"))
+                    digest.update(hashlib.sha256(path.read_bytes()).digest())
+        digest.update(self.dependency_data.graph_hash.encode("utf-8"))
+        return digest.hexdigest()
 
 
 class PyProjectToolchainPkg(ConanFile):
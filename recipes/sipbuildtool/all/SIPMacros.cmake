@@ -1,7 +1,18 @@
 # TODO: Add this CMake build module to the sipbuildtool generator
 # ~~~~~~~~~~~~~~
 
+set(_SIP_MACROS_DIR "${CMAKE_CURRENT_LIST_DIR}")
+
+# add_sip_module(MODULE_TARGET [UNITY_BATCH_SIZE <n>])
+#
+# UNITY_BATCH_SIZE compiles the generated sources as unity builds of <n> files each, fewer and larger translation units
+# that are spread over the build jobs. Set it to 0 to compile all generated sources as a single translation unit.
+#
+# When SIP_PROFILE_EVENTS is set to a file, every compile and link rule of the module is timed and appended to it, see
+# SipBuildTool.profile_variables(). Timing the rules requires the Makefile or Ninja generators.
 function(add_sip_module MODULE_TARGET)
+    cmake_parse_arguments(SIP "" "UNITY_BATCH_SIZE" "" ${ARGN})
+
     if(WIN32)
         set(ext .pyd)
         set(env_path_sep ";")
@@ -51,11 +62,51 @@ function(add_sip_module MODULE_TARGET)
     set_target_properties("sip_${MODULE_TARGET}" PROPERTIES SUFFIX ${ext})
     set_target_properties("sip_${MODULE_TARGET}" PROPERTIES OUTPUT_NAME "${MODULE_TARGET}")
 
+    if(DEFINED SIP_UNITY_BATCH_SIZE)
+        message(STATUS "SIP: Compiling the generated sources in unity batches of ${SIP_UNITY_BATCH_SIZE}")
+        # Only the generated sources are known to be safe to combine
+        if(usr_src)
+            set_source_files_properties(${usr_src} PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON)
+        endif()
+        set_target_properties("sip_${MODULE_TARGET}"
+                PROPERTIES
+                UNITY_BUILD ON
+                UNITY_BUILD_BATCH_SIZE ${SIP_UNITY_BATCH_SIZE})
+    endif()
+
+    if(SIP_PROFILE_EVENTS)
+        _sip_profile_rules("sip_${MODULE_TARGET}" ${MODULE_TARGET})
+    endif()
+
     set_target_properties("sip_${MODULE_TARGET}"
             PROPERTIES
             RESOURCE "${CMAKE_CURRENT_BINARY_DIR}/sip/${MODULE_TARGET}/${MODULE_TARGET}/${MODULE_TARGET}.pyi")
 endfunction()
 
+function(_sip_profile_rules TARGET MODULE_TARGET)
+    if(DEFINED Python_EXECUTABLE)
+        set(_sip_python "${Python_EXECUTABLE}")
+    else()
+        find_program(_sip_python NAMES python3 python REQUIRED)
+    endif()
+    get_filename_component(_sip_events_dir "${SIP_PROFILE_EVENTS}" DIRECTORY)
+    file(MAKE_DIRECTORY "${_sip_events_dir}")
+    message(STATUS "SIP: Timing the compile and link rules of ${MODULE_TARGET} in ${SIP_PROFILE_EVENTS}")
+
+    set(_sip_timer "${_sip_python}" "${_SIP_MACROS_DIR}/sip_rule_timer.py" "${SIP_PROFILE_EVENTS}")
+    foreach(_lang C CXX)
+        # Wrap a launcher that is already set, such as a compiler cache
+        set(_sip_compile_launcher ${_sip_timer} compile ${MODULE_TARGET})
+        get_target_property(_sip_compiler_launcher ${TARGET} ${_lang}_COMPILER_LAUNCHER)
+        if(_sip_compiler_launcher)
+            list(APPEND _sip_compile_launcher ${_sip_compiler_launcher})
+        endif()
+        set_target_properties(${TARGET} PROPERTIES
+                ${_lang}_COMPILER_LAUNCHER "${_sip_compile_launcher}"
+                ${_lang}_LINKER_LAUNCHER "${_sip_timer};link;${MODULE_TARGET}")
+    endforeach()
+endfunction()
+
 function(install_sip_module MODULE_TARGET)
     if(DEFINED ARGV1)
         set(_install_path ${CMAKE_INSTALL_PREFIX}/${ARGV1})
@@ -1,12 +1,54 @@
+import json
 import os
+import time
 from pathlib import Path
 
 from conan import ConanFile
-from conan.tools.files import chdir, copy
+from conan.tools.build import build_jobs
+from conan.tools.files import chdir, copy, load, save
 
 from conan.tools.microsoft.subsystems import unix_path
 
 
+PROFILE_FOLDER = "sip_profile"
+PROFILE_EVENTS_FILENAME = "events.jsonl"
+
+
+def profile_events_path(conanfile: ConanFile) -> Path:
+    """ The events file of the sip build profile, shared by the PyProjectToolchain, SipBuildTool and add_sip_module """
+    return Path(conanfile.build_folder, PROFILE_FOLDER, PROFILE_EVENTS_FILENAME)
+
+
+def start_profile(conanfile: ConanFile) -> Path:
+    """ Starts the profile of a new run, discarding the events of earlier runs, and returns the events file """
+    events_path = profile_events_path(conanfile)
+    save(conanfile, events_path, "")
+    return events_path
+
+
+def record_profile_event(events_path: Path, name: str, phase: str, start: float, duration: float) -> None:
+    """ Appends a timed event to the profile of a sip build, in the format of the sip_rule_timer.py launcher """
+    events_path.parent.mkdir(parents = True, exist_ok = True)
+    with open(events_path, "a", encoding = "utf-8") as f:
+        f.write(json.dumps({"name": name, "phase": phase, "start": start, "duration": duration}) + "\n")
+
+
+def _trace_lanes(events: list) -> list:
+    """ Assigns the events to the first lane that is free at their start, so parallel rules end up on separate rows """
+    lane_ends = []
+    lanes = []
+    for event in events:
+        for lane, end in enumerate(lane_ends):
+            if end <= event["start"]:
+                break
+        else:
+            lane = len(lane_ends)
+            lane_ends.append(0.0)
+        lane_ends[lane] = event["start"] + event["duration"]
+        lanes.append(lane)
+    return lanes
+
+
 class SipBuildTool(object):
     """
     A build tool for sip
@@ -17,33 +59,137 @@ class SipBuildTool(object):
     sip = self.python_requires["sipbuildtool"].module.SipBuildTool(self)
     sip.configure()
     sip.generate("projectName")
+
+    The PyProjectToolchain writes a fingerprint of the inputs of sip-build to the build folder. The build is skipped when
+    the fingerprint didn't change since the last successful build, set the user.sipbuildtool:force conf to always build.
+
+    By default sip-build only generates the C++ code, which is compiled by the add_sip_module CMake function. With the
+    py_sip_compile option sip-build compiles the code itself as well, with PyQt-builder in py_build_requires using as
+    many jobs as the Conan build jobs. The generated code can be concatenated into a number of larger translation units
+    with the concatenate argument.
+
+    With the user.sipbuildtool:profile conf, the PyProjectToolchain generation, sip-build and, when the CMake variables
+    of profile_variables() are passed to CMake, every compile and link rule of the add_sip_module targets are timed.
+    The PyProjectToolchain generation starts a new profile. Call profile_report() after the CMake build to write the
+    per-phase summary and a Chrome trace of the run to the build folder.
     """
+    _fingerprint_filename = "pyproject.fingerprint"
+    _stamp_filename = "sip-build.stamp"
 
     def __init__(self, conanfile: ConanFile):
         self._conanfile = conanfile
         self._sip_install_executable = "sip-build"
+        self._jobs = None
+        self._concatenate = None
+        self._profile = self._conanfile.conf.get("user.sipbuildtool:profile", default = False, check_type = bool)
 
-    def configure(self, sip_install_executable=None):
+    def configure(self, sip_install_executable=None, jobs=None, concatenate=None):
         if sip_install_executable:
             self._sip_install_executable = sip_install_executable
+        if jobs:
+            self._jobs = jobs
+        if concatenate:
+            self._concatenate = concatenate
+
+    def _arguments(self) -> str:
+        arguments = []
+        if self._conanfile.options.get_safe("py_sip_compile", False):
+            # Only the project builder of PyQt-builder has a --jobs option, the setuptools builder of sip has none
+            if "PyQt-builder" in str(self._conanfile.options.get_safe("py_build_requires", "")):
+                arguments.append(f"--jobs {self._jobs or build_jobs(self._conanfile) or 1}")
+            else:
+                self._conanfile.output.warning("sip-build only compiles in parallel with PyQt-builder in py_build_requires, "
+                                               "only --concatenate applies to the setuptools builder")
+        if self._concatenate:
+            arguments.append(f"--concatenate {self._concatenate}")
+        return " ".join(arguments)
+
+    def _is_up_to_date(self, fingerprint_path: Path, stamp_path: Path) -> bool:
+        if self._conanfile.conf.get("user.sipbuildtool:force", default = False, check_type = bool):
+            return False
+        if not fingerprint_path.exists() or not stamp_path.exists() or not Path(self._conanfile.build_folder, "sip").is_dir():
+            return False
+        return self._stamp(fingerprint_path) == load(self._conanfile, stamp_path)
+
+    def _stamp(self, fingerprint_path: Path) -> str:
+        """ The fingerprint of the inputs, and the options that change the generated code """
+        return f"{load(self._conanfile, fingerprint_path)}\nconcatenate={self._concatenate}"
+
+    @property
+    def _profile_events_path(self) -> Path:
+        return profile_events_path(self._conanfile)
+
+    def profile_variables(self) -> dict:
+        """ CMake variables enabling the timing of the add_sip_module rules, for the CMakeToolchain variables """
+        if not self._profile:
+            return {}
+        return {"SIP_PROFILE_EVENTS": self._profile_events_path.as_posix()}
 
     def build(self):
+        fingerprint_path = Path(self._conanfile.build_folder, self._fingerprint_filename)
+        stamp_path = Path(self._conanfile.build_folder, self._stamp_filename)
+        if self._is_up_to_date(fingerprint_path, stamp_path):
+            self._conanfile.output.info("The sip bindings are up to date, skipping sip-build")
+            return
+
         with chdir(self, self._conanfile.source_folder):
             sip_cmd = self._sip_install_executable
             subsystem = unix_path(self._conanfile, ".")
             sip_cmd = str(Path(subsystem).joinpath(sip_cmd))
-            cmd = '"{}"'.format(sip_cmd)
+            cmd = '"{}" {}'.format(sip_cmd, self._arguments()).rstrip()
             self._conanfile.output.info(f"Calling:\n > {cmd}")
+            start = time.time()
             self._conanfile.run(cmd)
+            if self._profile:
+                record_profile_event(self._profile_events_path, self._conanfile.name, "sip-build", start, time.time() - start)
+
+        # Only stamp the build once it succeeded, a failed build is retried on the next run
+        if fingerprint_path.exists():
+            save(self._conanfile, stamp_path, self._stamp(fingerprint_path))
+
+    def profile_report(self) -> None:
+        """ Writes the per-phase timing summary and the Chrome trace (chrome://tracing, Perfetto) of the recorded events
+        to the sip_profile folder in the build folder """
+        if not self._profile or not self._profile_events_path.exists():
+            return
+        events = [json.loads(line) for line in load(self._conanfile, self._profile_events_path).splitlines() if line.strip()]
+        if not events:
+            return
+        events.sort(key = lambda event: event["start"])
+        begin = events[0]["start"]
+
+        trace_events = [{"name": event["name"], "cat": event["phase"], "ph": "X", "pid": 1, "tid": lane,
+                         "ts": round((event["start"] - begin) * 1e6), "dur": round(event["duration"] * 1e6),
+                         "args": {key: value for key, value in event.items() if key not in ("name", "phase", "start", "duration")}}
+                        for event, lane in zip(events, _trace_lanes(events))]
+        trace_path = self._profile_events_path.with_name("trace.json")
+        save(self._conanfile, trace_path, json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}))
+
+        # The wall time of a phase is the time between its first start and its last end, the cpu time adds up its events
+        summary = {}
+        for event in events:
+            phase = summary.setdefault(event["phase"], {"events": 0, "seconds": 0.0, "start": event["start"], "end": 0.0})
+            phase["events"] += 1
+            phase["seconds"] += event["duration"]
+            phase["end"] = max(phase["end"], event["start"] + event["duration"])
+        summary = {name: {"events": phase["events"], "seconds": round(phase["seconds"], 3),
+                          "wall_seconds": round(phase["end"] - phase["start"], 3)} for name, phase in summary.items()}
+        save(self._conanfile, self._profile_events_path.with_name("summary.json"), json.dumps(summary, indent = 2))
+
+        lines = [f"Sip build profile, Chrome trace written to {trace_path}"]
+        lines += [f"  {name:<16} {phase['events']:>6} events {phase['seconds']:10.3f}s {phase['wall_seconds']:10.3f}s wall"
+                  for name, phase in summary.items()]
+        self._conanfile.output.info("\n".join(lines))
 
 
 class Pkg(ConanFile):
     name = "sipbuildtool"
     package_type = "build-scripts"
-    exports_sources = "SIPMacros.cmake"
+    exports_sources = "SIPMacros.cmake", "sip_rule_timer.py"
 
     def package(self):
         copy(self, pattern="*.cmake", src=self.export_sources_folder, dst=os.path.join(self.package_folder, "cmake"))
+        copy(self, pattern="sip_rule_timer.py", src=self.export_sources_folder, dst=os.path.join(self.package_folder, "cmake"))
 
     def package_info(self):
         self.cpp_info.set_property("name", "sip")
@@ -0,0 +1,39 @@
+"""
+Rule launcher recording the duration of a compile or link rule of the add_sip_module targets
+
+Usage: sip_rule_timer.py <events file> <phase> <target> <command>...
+
+The command is run as-is, its duration is appended as a JSON line to the events file, which is turned into a report by
+SipBuildTool.profile_report().
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def main(events_path: str, phase: str, target: str, command: list) -> int:
+    start = time.time()
+    return_code = subprocess.call(command)
+    duration = time.time() - start
+
+    # The output file of the rule names the event, fall back to the last argument
+    name = command[-1]
+    for flag in ("-o", "/Fo", "-Fo", "/OUT:"):
+        for index, argument in enumerate(command):
+            if argument == flag and index + 1 < len(command):
+                name = command[index + 1]
+            elif argument.startswith(flag) and len(argument) > len(flag):
+                name = argument[len(flag):]
+
+    event = {"name": os.path.basename(name), "phase": phase, "target": target, "start": start, "duration": duration,
+             "return_code": return_code}
+    # A single short line per write, so the parallel rules don't interleave their events
+    with open(events_path, "a", encoding = "utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+    return return_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4:]))
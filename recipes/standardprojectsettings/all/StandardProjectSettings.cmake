@@ -1,3 +1,5 @@
+# Most settings below are directory scoped variables and properties, sibling directories including this module need them too
+include_guard(DIRECTORY)
 include(GNUInstallDirs) # Standard install dirs
 
 # Generate compile_commands.json to make it easier to work with clang based tools
@@ -178,6 +180,127 @@ function(enable_sanitizers project_name)
 
 endfunction()
 
+# Defaults of the options below as set by the options of the standardprojectsettings Conan package
+include(${CMAKE_CURRENT_LIST_DIR}/StandardProjectSettingsDefaults.cmake OPTIONAL)
+
+option(ENABLE_IPO "Enable interprocedural optimization (link-time optimization) for the targets passed to enable_ipo" OFF)
+set(ENABLE_PGO "OFF" CACHE STRING "Profile-guided optimization phase for the targets passed to enable_pgo: OFF, GENERATE or USE")
+set_property(CACHE ENABLE_PGO PROPERTY STRINGS OFF GENERATE USE)
+set(PGO_PROFILE_DIR "${CMAKE_BINARY_DIR}/pgo-profile" CACHE PATH "Directory the profile-guided optimization data is written to and read from")
+
+function(enable_ipo project_name)
+    if(NOT ENABLE_IPO)
+        return()
+    endif()
+
+    get_target_property(type ${project_name} TYPE)
+    if (${type} STREQUAL "INTERFACE_LIBRARY")
+        message(WARNING "Interprocedural optimization can't be enabled for interface library ${project_name}")
+        return()
+    endif()
+
+    include(CheckIPOSupported)
+    check_ipo_supported(RESULT ipo_supported OUTPUT ipo_output)
+    if(NOT ipo_supported)
+        message(WARNING "Interprocedural optimization is not supported: ${ipo_output}")
+        return()
+    endif()
+
+    message(STATUS "Enabling interprocedural optimization for ${project_name}")
+    # CMake picks the flags and the archiver tools per compiler, ThinLTO for Clang and a parallel LTO for GCC
+    set_target_properties(${project_name} PROPERTIES INTERPROCEDURAL_OPTIMIZATION ON)
+endfunction()
+
+# enable_pgo(project_name [GENERATE|USE] [PROFILE_DIR <dir>])
+#
+# GENERATE builds an instrumented binary that writes its profile to the profile directory when it runs, USE optimizes
+# the binary with that profile. The phase defaults to ENABLE_PGO and the profile directory to PGO_PROFILE_DIR.
+function(enable_pgo project_name)
+    cmake_parse_arguments(ARG "GENERATE;USE" "PROFILE_DIR" "" ${ARGN})
+    if(ARG_GENERATE)
+        set(phase "GENERATE")
+    elseif(ARG_USE)
+        set(phase "USE")
+    else()
+        string(TOUPPER "${ENABLE_PGO}" phase)
+    endif()
+    if(NOT phase OR phase STREQUAL "OFF")
+        return()
+    endif()
+    if(ARG_PROFILE_DIR)
+        set(profile_dir "${ARG_PROFILE_DIR}")
+    else()
+        set(profile_dir "${PGO_PROFILE_DIR}")
+    endif()
+    file(MAKE_DIRECTORY "${profile_dir}")
+
+    if(MSVC)
+        set(pgd_file "${profile_dir}/${project_name}.pgd")
+        if(phase STREQUAL "GENERATE")
+            set(compile_options /GL)
+            set(link_options /LTCG /GENPROFILE:PGD=${pgd_file})
+        elseif(phase STREQUAL "USE")
+            set(compile_options /GL)
+            set(link_options /LTCG /USEPROFILE:PGD=${pgd_file})
+        endif()
+    elseif(CMAKE_CXX_COMPILER_ID MATCHES ".*Clang")
+        if(phase STREQUAL "GENERATE")
+            set(compile_options -fprofile-generate=${profile_dir})
+            set(link_options -fprofile-generate=${profile_dir})
+        elseif(phase STREQUAL "USE")
+            # Clang writes raw profiles, which are merged into the indexed profile it reads
+            set(profdata_file "${profile_dir}/default.profdata")
+            file(GLOB profraw_files "${profile_dir}/*.profraw")
+            if(profraw_files)
+                get_filename_component(compiler_dir "${CMAKE_CXX_COMPILER}" DIRECTORY)
+                string(REGEX MATCH "^[0-9]+" compiler_major_version "${CMAKE_CXX_COMPILER_VERSION}")
+                find_program(LLVM_PROFDATA NAMES llvm-profdata llvm-profdata-${compiler_major_version} HINTS "${compiler_dir}")
+                if(LLVM_PROFDATA)
+                    execute_process(COMMAND ${LLVM_PROFDATA} merge -output=${profdata_file} ${profraw_files} RESULT_VARIABLE merge_result)
+                    if(NOT merge_result EQUAL 0)
+                        message(WARNING "Unable to merge the profiles in ${profile_dir}")
+                    endif()
+                else()
+                    message(WARNING "llvm-profdata is required to merge the profiles in ${profile_dir}")
+                endif()
+            endif()
+            if(NOT EXISTS "${profdata_file}")
+                message(WARNING "No profile found in ${profile_dir}, building ${project_name} without profile-guided optimization")
+                return()
+            endif()
+            set(compile_options -fprofile-use=${profdata_file} -Wno-profile-instr-unprofiled -Wno-profile-instr-out-of-date)
+            set(link_options -fprofile-use=${profdata_file})
+        endif()
+    elseif(CMAKE_CXX_COMPILER_ID STREQUAL "GNU")
+        if(phase STREQUAL "GENERATE")
+            set(compile_options -fprofile-generate -fprofile-dir=${profile_dir} -fprofile-update=atomic)
+            set(link_options -fprofile-generate)
+        elseif(phase STREQUAL "USE")
+            # Objects without profile, or with a profile of older sources, are compiled without it instead of failing
+            set(compile_options -fprofile-use -fprofile-dir=${profile_dir} -fprofile-correction -Wno-missing-profile -Wno-coverage-mismatch)
+            set(link_options -fprofile-use)
+        endif()
+    else()
+        message(AUTHOR_WARNING "No profile-guided optimization flags known for '${CMAKE_CXX_COMPILER_ID}' compiler.")
+        return()
+    endif()
+
+    if(NOT compile_options)
+        message(WARNING "Unknown profile-guided optimization phase '${phase}', use GENERATE or USE")
+        return()
+    endif()
+
+    message(STATUS "Enabling profile-guided optimization (${phase}) for ${project_name} with profile directory ${profile_dir}")
+    get_target_property(type ${project_name} TYPE)
+    if (${type} STREQUAL "INTERFACE_LIBRARY")
+        target_compile_options(${project_name} INTERFACE ${compile_options})
+        target_link_options(${project_name} INTERFACE ${link_options})
+    else()
+        target_compile_options(${project_name} PRIVATE ${compile_options})
+        target_link_options(${project_name} PRIVATE ${link_options})
+    endif()
+endfunction()
+
 option(ENABLE_CPPCHECK "Enable static analysis with cppcheck" OFF)
 option(ENABLE_CLANG_TIDY "Enable static analysis with clang-tidy" OFF)
 option(ENABLE_INCLUDE_WHAT_YOU_USE "Enable static analysis with include-what-you-use" OFF)
@@ -218,3 +341,100 @@ if(ENABLE_INCLUDE_WHAT_YOU_USE)
         message(WARNING "include-what-you-use requested but executable not found")
     endif()
 endif()
+
+# Build accelerators, they apply to the targets created after this module is included
+set(ENABLE_COMPILER_CACHE "OFF" CACHE STRING "Compiler cache used as compiler launcher: OFF, AUTO, ccache or sccache")
+set_property(CACHE ENABLE_COMPILER_CACHE PROPERTY STRINGS OFF AUTO ccache sccache)
+set(ENABLE_FAST_LINKER "OFF" CACHE STRING "Linker used instead of the default linker: OFF, AUTO, mold or lld")
+set_property(CACHE ENABLE_FAST_LINKER PROPERTY STRINGS OFF AUTO mold lld)
+option(ENABLE_UNITY_BUILD "Compile all targets as unity builds" OFF)
+set(UNITY_BUILD_BATCH_SIZE 8 CACHE STRING "Number of sources combined into a unity build source, 0 combines all sources of a target")
+
+set(BUILD_ACCELERATORS)
+get_property(_enabled_languages GLOBAL PROPERTY ENABLED_LANGUAGES)
+
+string(TOLOWER "${ENABLE_COMPILER_CACHE}" _compiler_cache)
+if(_compiler_cache AND NOT _compiler_cache STREQUAL "off")
+    # The found program is cached per choice, so switching ENABLE_COMPILER_CACHE doesn't keep the previous program
+    set(_compiler_cache_program COMPILER_CACHE_PROGRAM_${_compiler_cache})
+    if(_compiler_cache STREQUAL "auto")
+        set(_compiler_cache ccache sccache)
+    endif()
+    if(CMAKE_GENERATOR MATCHES "Visual Studio|Xcode")
+        message(WARNING "A compiler cache requires the Makefile or Ninja generators, not using one with ${CMAKE_GENERATOR}")
+    else()
+        find_program(${_compiler_cache_program} NAMES ${_compiler_cache})
+        if(${_compiler_cache_program})
+            foreach(_lang C CXX)
+                # A launcher that is already set, e.g. on the command line, is kept
+                if(_lang IN_LIST _enabled_languages AND NOT CMAKE_${_lang}_COMPILER_LAUNCHER)
+                    set(CMAKE_${_lang}_COMPILER_LAUNCHER "${${_compiler_cache_program}}")
+                endif()
+            endforeach()
+            get_filename_component(_compiler_cache_name "${${_compiler_cache_program}}" NAME_WE)
+            list(APPEND BUILD_ACCELERATORS "${_compiler_cache_name} (compiler cache)")
+        else()
+            message(WARNING "Compiler cache requested (${ENABLE_COMPILER_CACHE}) but none of ${_compiler_cache} was found, building without one")
+        endif()
+    endif()
+endif()
+
+string(TOLOWER "${ENABLE_FAST_LINKER}" _fast_linker)
+if(_fast_linker AND NOT _fast_linker STREQUAL "off")
+    if(_fast_linker STREQUAL "auto")
+        set(_fast_linker mold lld)
+    endif()
+    if(MSVC OR NOT (CMAKE_CXX_COMPILER_ID STREQUAL "GNU" OR CMAKE_CXX_COMPILER_ID MATCHES ".*Clang"))
+        message(WARNING "A fast linker can only be selected for GCC and Clang, using the default linker")
+    else()
+        include(CheckLinkerFlag)
+        if("CXX" IN_LIST _enabled_languages)
+            set(_linker_check_language CXX)
+        else()
+            set(_linker_check_language C)
+        endif()
+        # The first linker that is installed and supported by the compiler is used, falls back to the default linker
+        set(_fast_linker_found OFF)
+        foreach(_linker ${_fast_linker})
+            check_linker_flag(${_linker_check_language} "-fuse-ld=${_linker}" HAVE_LINKER_${_linker})
+            if(HAVE_LINKER_${_linker})
+                add_link_options("-fuse-ld=${_linker}")
+                list(APPEND BUILD_ACCELERATORS "${_linker} (linker)")
+                set(_fast_linker_found ON)
+                break()
+            endif()
+        endforeach()
+        if(NOT _fast_linker_found)
+            message(WARNING "Fast linker requested (${ENABLE_FAST_LINKER}) but none of ${_fast_linker} is usable, using the default linker")
+        endif()
+    endif()
+endif()
+
+if(ENABLE_UNITY_BUILD)
+    set(CMAKE_UNITY_BUILD ON)
+    set(CMAKE_UNITY_BUILD_BATCH_SIZE ${UNITY_BUILD_BATCH_SIZE})
+    list(APPEND BUILD_ACCELERATORS "unity build (batch size ${UNITY_BUILD_BATCH_SIZE})")
+endif()
+
+# Compile a single target as unity build, regardless of ENABLE_UNITY_BUILD
+function(enable_unity_build project_name)
+    cmake_parse_arguments(ARG "" "BATCH_SIZE" "" ${ARGN})
+    if(NOT DEFINED ARG_BATCH_SIZE)
+        set(ARG_BATCH_SIZE ${UNITY_BUILD_BATCH_SIZE})
+    endif()
+    message(STATUS "Enabling unity build for ${project_name} with batch size ${ARG_BATCH_SIZE}")
+    set_target_properties(${project_name} PROPERTIES UNITY_BUILD ON UNITY_BUILD_BATCH_SIZE ${ARG_BATCH_SIZE})
+endfunction()
+
+# Excludes a target from the unity builds enabled with ENABLE_UNITY_BUILD, for sources that can't be combined
+function(disable_unity_build project_name)
+    message(STATUS "Disabling unity build for ${project_name}")
+    set_target_properties(${project_name} PROPERTIES UNITY_BUILD OFF)
+endfunction()
+
+if(BUILD_ACCELERATORS)
+    list(JOIN BUILD_ACCELERATORS ", " _build_accelerators)
+    message(STATUS "Build accelerators: ${_build_accelerators}")
+else()
+    message(STATUS "Build accelerators: none")
+endif()
@@ -1,16 +1,48 @@
 from os import path
 
 from conan import ConanFile
-from conan.tools.files import copy
+from conan.tools.files import copy, save
 
 
 class Pkg(ConanFile):
     name = "standardprojectsettings"
     exports_sources = "StandardProjectSettings.cmake"
     package_type = "build-scripts"
+    options = {
+        "enable_ipo": [True, False],
+        "enable_pgo": ["off", "generate", "use"],
+        "pgo_profile_dir": [None, "ANY"],
+        "compiler_cache": ["off", "auto", "ccache", "sccache"],
+        "fast_linker": ["off", "auto", "mold", "lld"],
+        "unity_build": [True, False],
+        "unity_build_batch_size": ["ANY"],
+    }
+    default_options = {
+        "enable_ipo": False,
+        "enable_pgo": "off",
+        "pgo_profile_dir": None,
+        "compiler_cache": "off",
+        "fast_linker": "off",
+        "unity_build": False,
+        "unity_build_batch_size": "8",
+    }
+
+    def _defaults(self) -> str:
+        """ The defaults of the cache variables of StandardProjectSettings.cmake, values passed to CMake still win """
+        defaults = "# Generated by the standardprojectsettings package from its options\n"
+        defaults += f"set(ENABLE_IPO {'ON' if self.options.enable_ipo else 'OFF'} CACHE BOOL \"\")\n"
+        defaults += f"set(ENABLE_PGO {str(self.options.enable_pgo).upper()} CACHE STRING \"\")\n"
+        if self.options.pgo_profile_dir:
+            defaults += f"set(PGO_PROFILE_DIR \"{str(self.options.pgo_profile_dir)}\" CACHE PATH \"\")\n"
+        defaults += f"set(ENABLE_COMPILER_CACHE {str(self.options.compiler_cache)} CACHE STRING \"\")\n"
+        defaults += f"set(ENABLE_FAST_LINKER {str(self.options.fast_linker)} CACHE STRING \"\")\n"
+        defaults += f"set(ENABLE_UNITY_BUILD {'ON' if self.options.unity_build else 'OFF'} CACHE BOOL \"\")\n"
+        defaults += f"set(UNITY_BUILD_BATCH_SIZE {str(self.options.unity_build_batch_size)} CACHE STRING \"\")\n"
+        return defaults
 
     def package(self):
         copy(self, "StandardProjectSettings.cmake", src = self.export_sources_folder, dst = path.join(self.package_folder, "res", "cmake"))
+        save(self, path.join(self.package_folder, "res", "cmake", "StandardProjectSettingsDefaults.cmake"), self._defaults())
 
     def package_info(self):
         self.cpp_info.includedirs = []
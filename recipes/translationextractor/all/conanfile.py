@@ -1,13 +1,786 @@
 from pathlib import Path
+import ast
+import hashlib
+import io
 import json
+import multiprocessing
+import platform
+import re
+import struct
+import sys
+import tempfile
 import time
 import collections
-from typing import List, Any, Set
+import contextlib
+import fnmatch
+import os
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Any, Set, Dict, Optional, Tuple
 
 from conan import ConanFile
+from conan.tools.build import build_jobs
 from conan.tools.files import save, load, rm
 
 
+# Keywords recognized by the extraction, mapped to the 1-based argument positions of the (context, singular, plural)
+# strings. Besides the i18n keywords, xgettext also recognizes its default keywords for every language.
+_I18N_KEYWORDS = {
+    "i18n": (None, 1, None),
+    "i18nc": (1, 2, None),
+    "i18np": (None, 1, 2),
+    "i18ncp": (1, 2, 3),
+}
+
+_EXTRACTION_KEYWORDS = {
+    "python": {
+        "_": (None, 1, None),
+        "gettext": (None, 1, None),
+        "ugettext": (None, 1, None),
+        "dgettext": (None, 2, None),
+        "ngettext": (None, 1, 2),
+        "ungettext": (None, 1, 2),
+        "dngettext": (None, 2, 3),
+        "pgettext": (1, 2, None),
+        "dpgettext": (2, 3, None),
+        "npgettext": (1, 2, 3),
+        "dnpgettext": (2, 3, 4),
+        **_I18N_KEYWORDS,
+    },
+    "javascript": {
+        "_": (None, 1, None),
+        "gettext": (None, 1, None),
+        "dgettext": (None, 2, None),
+        "dcgettext": (None, 2, None),
+        "ngettext": (None, 1, 2),
+        "dngettext": (None, 2, 3),
+        "pgettext": (1, 2, None),
+        "dpgettext": (2, 3, None),
+        **_I18N_KEYWORDS,
+    },
+}
+
+_PYTHON_FORMAT_RE = re.compile(r"%(\([^)]*\))?[#0 +-]*(\*|\d+)?(\.(\*|\d+))?[hlL]?[diouxXeEfFgGcrsa]")
+_PYTHON_BRACE_FORMAT_RE = re.compile(r"(?<!\{)\{[A-Za-z0-9_]*(\.[A-Za-z_]\w*|\[[^\]]*\])*(![rsa])?(:[^{}]*)?\}(?!\})")
+
+_JAVASCRIPT_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+  | (?P<identifier>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punctuation>\S)
+""", re.VERBOSE | re.DOTALL)
+
+# A / after one of these tokens starts a regular expression literal, after any other token it is a division
+_JAVASCRIPT_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^") | frozenset(
+    ("return", "typeof", "case", "do", "else", "in", "instanceof", "new", "delete", "void", "throw"))
+_JAVASCRIPT_REGEX_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+_JAVASCRIPT_WHITESPACE_RE = re.compile(r"\s*")
+
+_JAVASCRIPT_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+_JAVASCRIPT_ESCAPE_RE = re.compile(r"\\(u\{[0-9A-Fa-f]+\}|u[0-9A-Fa-f]{4}|x[0-9A-Fa-f]{2}|\r\n|.)", re.DOTALL)
+
+
+def _message_flags(language: str, msgids) -> tuple:
+    """ The format flags xgettext adds for strings that look like format strings """
+    if language != "python":
+        return ()
+    flags = []
+    if any(_PYTHON_FORMAT_RE.search(msgid.replace("%%", "")) for msgid in msgids):
+        flags.append("python-format")
+    if any(_PYTHON_BRACE_FORMAT_RE.search(msgid.replace("{{", "").replace("}}", "")) for msgid in msgids):
+        flags.append("python-brace-format")
+    return tuple(flags)
+
+
+def _make_message(language: str, spec: tuple, arguments: list) -> Optional[tuple]:
+    """ Builds a (msgctxt, msgid, msgid_plural, flags) message from the literal arguments of a keyword call, None when
+    one of the arguments of the keyword isn't a string literal """
+    strings = []
+    for position in spec:
+        if position is None:
+            strings.append(None)
+        elif position > len(arguments) or arguments[position - 1] is None:
+            return None
+        else:
+            strings.append(arguments[position - 1])
+    msgctxt, msgid, msgid_plural = strings
+    return msgctxt, msgid, msgid_plural, _message_flags(language, [s for s in (msgid, msgid_plural) if s is not None])
+
+
+def _extract_python_messages(source: str) -> List[tuple]:
+    keywords = _EXTRACTION_KEYWORDS["python"]
+    messages = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call):
+            continue
+        if isinstance(node.func, ast.Name):
+            name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            name = node.func.attr
+        else:
+            continue
+        if name not in keywords:
+            continue
+        arguments = [arg.value if isinstance(arg, ast.Constant) and isinstance(arg.value, str) else None for arg in node.args]
+        message = _make_message("python", keywords[name], arguments)
+        if message is not None:
+            messages.append(message)
+    return messages
+
+
+def _unescape_javascript_string(literal: str) -> str:
+    def replace(match):
+        escape = match.group(1)
+        if escape.startswith("u{"):
+            return chr(int(escape[2:-1], 16))
+        if escape.startswith("u") and len(escape) == 5:
+            return chr(int(escape[1:], 16))
+        if escape.startswith("x") and len(escape) == 3:
+            return chr(int(escape[1:], 16))
+        if escape in ("\n", "\r\n", "\r"):
+            return ""  # line continuation
+        return _JAVASCRIPT_ESCAPES.get(escape, escape)
+
+    return _JAVASCRIPT_ESCAPE_RE.sub(replace, literal[1:-1])
+
+
+def _javascript_tokens(source: str) -> List[Tuple[str, str]]:
+    """ The (kind, value) tokens of a JavaScript source, without the comments. Regular expression literals are single
+    tokens, so the quotes inside them don't start a string. """
+    tokens = []
+    position = _JAVASCRIPT_WHITESPACE_RE.match(source).end()
+    while position < len(source):
+        match = None
+        if source[position] == "/" and (not tokens or tokens[-1][1] in _JAVASCRIPT_REGEX_PRECEDERS) \
+                and not source.startswith(("//", "/*"), position):
+            match = _JAVASCRIPT_REGEX_RE.match(source, position)
+            if match is not None:
+                tokens.append(("regex", match.group()))
+        if match is None:
+            match = _JAVASCRIPT_TOKEN_RE.match(source, position)
+            if match.lastgroup != "comment":
+                tokens.append((match.lastgroup, match.group()))
+        position = _JAVASCRIPT_WHITESPACE_RE.match(source, match.end()).end()
+    return tokens
+
+
+def _extract_javascript_messages(source: str) -> List[tuple]:
+    keywords = _EXTRACTION_KEYWORDS["javascript"]
+    tokens = _javascript_tokens(source)
+    messages = []
+    for index, (kind, value) in enumerate(tokens):
+        if kind != "identifier" or value not in keywords or index + 1 >= len(tokens) or tokens[index + 1][1] != "(":
+            continue
+
+        # Split the arguments on the top level commas until the closing parenthesis
+        arguments = [[]]
+        depth = 0
+        for arg_kind, arg_value in tokens[index + 2:]:
+            if arg_kind == "punctuation" and arg_value in "([{":
+                depth += 1
+            elif arg_kind == "punctuation" and arg_value in ")]}":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif arg_kind == "punctuation" and arg_value == "," and depth == 0:
+                arguments.append([])
+                continue
+            arguments[-1].append((arg_kind, arg_value))
+
+        # An argument is a string when it starts with a literal, literals concatenated with + are joined
+        literals = []
+        for argument in arguments:
+            strings = []
+            for position, (arg_kind, arg_value) in enumerate(argument):
+                if position % 2 == 0 and arg_kind == "string" and not (arg_value.startswith("`") and "${" in arg_value):
+                    strings.append(_unescape_javascript_string(arg_value))
+                elif position % 2 == 1 and arg_value == "+":
+                    continue
+                else:
+                    break
+            literals.append("".join(strings) if strings else None)
+
+        message = _make_message("javascript", keywords[value], literals)
+        if message is not None:
+            messages.append(message)
+    return messages
+
+
+def _extract_file_messages(job: Tuple[str, str]) -> Tuple[str, List[tuple], Optional[str]]:
+    """ Process pool worker: extracts the messages of a single source file """
+    path, language = job
+    try:
+        with open(path, "r", encoding = "utf-8") as f:
+            source = f.read()
+        if language == "python":
+            return path, _extract_python_messages(source), None
+        return path, _extract_javascript_messages(source), None
+    except (SyntaxError, UnicodeDecodeError, OSError) as e:
+        return path, [], str(e)
+
+
+_JSON_DECODER = json.JSONDecoder(object_pairs_hook = collections.OrderedDict)
+_JSON_WHITESPACE_RE = re.compile(r"\s*")
+_JSON_STRUCTURE_RE = re.compile(r"\"(?:[^\"\\]|\\.)*\"|[\[\]{}]")
+
+# The metadata of a definition that is needed to extract the variant names
+_DEFINITION_METADATA_KEYS = ("variants_name", "variants_name_has_translation")
+
+
+def _skip_json_value(content: str, index: int) -> int:
+    """ The index after the JSON value starting at index, objects and arrays are skipped without decoding them """
+    if content[index] not in "[{":
+        return _JSON_DECODER.raw_decode(content, index)[1]
+    depth = 0
+    for match in _JSON_STRUCTURE_RE.finditer(content, index):
+        token = match.group()
+        if token in ("[", "{"):
+            depth += 1
+        elif token in ("]", "}"):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated JSON value")
+
+
+def _json_top_level(content: str, keys) -> Dict[str, Any]:
+    """ Decodes only the values of the given keys of the top-level JSON object, the other values are skipped """
+    values = {}
+    index = _JSON_WHITESPACE_RE.match(content, 0).end()
+    if content[index:index + 1] != "{":
+        raise ValueError("Expected a JSON object")
+    index = _JSON_WHITESPACE_RE.match(content, index + 1).end()
+    if content[index:index + 1] == "}":
+        return values
+    while True:
+        key, index = _JSON_DECODER.raw_decode(content, index)
+        index = _JSON_WHITESPACE_RE.match(content, index).end()
+        if content[index:index + 1] != ":":
+            raise ValueError(f"Expected ':' at position {index}")
+        index = _JSON_WHITESPACE_RE.match(content, index + 1).end()
+        if key in keys:
+            values[key], index = _JSON_DECODER.raw_decode(content, index)
+        else:
+            index = _skip_json_value(content, index)
+        index = _JSON_WHITESPACE_RE.match(content, index).end()
+        if content[index:index + 1] == "}":
+            return values
+        if content[index:index + 1] != ",":
+            raise ValueError(f"Expected ',' at position {index}")
+        index = _JSON_WHITESPACE_RE.match(content, index + 1).end()
+
+
+def _setting_messages(settings, messages: Optional[List[tuple]] = None) -> List[tuple]:
+    """ The (msgctxt, msgid) messages of the label, descriptions and options of the settings, depth first """
+    if messages is None:
+        messages = []
+    for name, value in settings.items():
+        if "label" in value:
+            messages.append((f"{name} label", value["label"]))
+        if "description" in value:
+            messages.append((f"{name} description", value["description"]))
+        if "warning_description" in value:
+            messages.append((f"{name} warning_description", value["warning_description"]))
+        if "error_description" in value:
+            messages.append((f"{name} error_description", value["error_description"]))
+        if "options" in value:
+            for item, description in value["options"].items():
+                messages.append(("{0} option {1}".format(name, item), description))
+        if "children" in value:
+            _setting_messages(value["children"], messages)
+    return messages
+
+
+def _parse_definition(path: str) -> Tuple[str, Optional[dict], Optional[str]]:
+    """ Process pool worker: parses a settings definition into the data the extraction needs. Definitions that inherit
+    from another definition only contribute their metadata, only their top-level keys are scanned. """
+    try:
+        with open(path, "r", encoding = "utf-8") as f:
+            content = f.read()
+
+        definition = _json_top_level(content, ("inherits", "metadata"))
+        if "inherits" not in definition:
+            setting_dict = _JSON_DECODER.decode(content)
+            settings = setting_dict["settings"] if "settings" in setting_dict else setting_dict
+            definition["messages"] = _setting_messages(settings)
+        if "metadata" in definition:
+            definition["metadata"] = {key: definition["metadata"][key] for key in _DEFINITION_METADATA_KEYS if key in definition["metadata"]}
+        return path, definition, None
+    except (ValueError, OSError) as e:
+        return path, None, str(e)
+
+
+@contextlib.contextmanager
+def _executor(max_workers: int):
+    """ A process pool when worker processes can be forked from the Conan process, a thread pool otherwise.
+
+    Conan loads the conanfile under a generated module name that is never registered in sys.modules, while the pool
+    pickles the workers by reference to their module. The module is registered under that name while the pool runs,
+    so the workers resolve in this process and in the forked worker processes. """
+    if "fork" not in multiprocessing.get_all_start_methods() or platform.system() != "Linux":
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            yield executor
+        return
+
+    registered = __name__ not in sys.modules
+    if registered:
+        module = types.ModuleType(__name__)
+        module.__dict__.update(globals())
+        sys.modules[__name__] = module
+    try:
+        with ProcessPoolExecutor(max_workers = max_workers, mp_context = multiprocessing.get_context("fork")) as executor:
+            yield executor
+    finally:
+        if registered:
+            sys.modules.pop(__name__, None)
+
+
+_PO_ESCAPES = {"\\": "\\\\", "\"": "\\\"", "\n": "\\n", "\t": "\\t", "\r": "\\r", "\a": "\\a", "\b": "\\b", "\f": "\\f",
+               "\v": "\\v"}
+_PO_ESCAPE_RE = re.compile("|".join(re.escape(char) for char in _PO_ESCAPES))
+
+
+def _po_escape(value: str) -> str:
+    return _PO_ESCAPE_RE.sub(lambda match: _PO_ESCAPES[match.group()], value)
+
+
+def _po_string(keyword: str, value: str) -> str:
+    """ Formats a PO keyword like xgettext --no-wrap does, splitting strings after embedded newlines """
+    lines = value.split("\n")
+    segments = [line + "\n" for line in lines[:-1]] + ([lines[-1]] if lines[-1] else [])
+    if len(segments) <= 1:
+        return f"{keyword} \"{_po_escape(value)}\"\n"
+    return f"{keyword} \"\"\n" + "".join(f"\"{_po_escape(segment)}\"\n" for segment in segments)
+
+
+_PO_UNESCAPES = {escape: char for char, escape in _PO_ESCAPES.items()}
+_PO_UNESCAPE_RE = re.compile(r"\\(.)")
+_PO_KEYWORD_RE = re.compile(r"^(msgctxt|msgid_plural|msgid|msgstr(?:\[\d+\])?)\s+\"(.*)\"\s*$")
+_PO_CONTINUATION_RE = re.compile(r"^\"(.*)\"\s*$")
+
+
+def _po_unescape(value: str) -> str:
+    return _PO_UNESCAPE_RE.sub(lambda match: _PO_UNESCAPES.get(match.group(), match.group(1)), value)
+
+
+def _xgettext_header(has_plurals: bool) -> str:
+    """ The header xgettext writes in a new pot file """
+    header = "# SOME DESCRIPTIVE TITLE.\n"
+    header += "# Copyright (C) YEAR THE PACKAGE'S COPYRIGHT HOLDER\n"
+    header += "# This file is distributed under the same license as the PACKAGE package.\n"
+    header += "# FIRST AUTHOR <EMAIL@ADDRESS>, YEAR.\n"
+    header += "#\n"
+    header += "#, fuzzy\n"
+    header += "msgid \"\"\n"
+    header += "msgstr \"\"\n"
+    header += "\"Project-Id-Version: PACKAGE VERSION\\n\"\n"
+    header += "\"Report-Msgid-Bugs-To: \\n\"\n"
+    header += "\"POT-Creation-Date: {}\\n\"\n".format(time.strftime("%Y-%m-%d %H:%M%z"))
+    header += "\"PO-Revision-Date: YEAR-MO-DA HO:MI+ZONE\\n\"\n"
+    header += "\"Last-Translator: FULL NAME <EMAIL@ADDRESS>\\n\"\n"
+    header += "\"Language-Team: LANGUAGE <LL@li.org>\\n\"\n"
+    header += "\"Language: \\n\"\n"
+    header += "\"MIME-Version: 1.0\\n\"\n"
+    header += "\"Content-Type: text/plain; charset=CHARSET\\n\"\n"
+    header += "\"Content-Transfer-Encoding: 8bit\\n\"\n"
+    if has_plurals:
+        header += "\"Plural-Forms: nplurals=INTEGER; plural=EXPRESSION;\\n\"\n"
+    return header
+
+
+class _CatalogEntry(object):
+    """ A single message of a po or pot file """
+    __slots__ = ("msgctxt", "msgid", "msgid_plural", "msgstr", "flags", "comments")
+
+    def __init__(self, msgctxt: Optional[str], msgid: str, msgid_plural: Optional[str] = None,
+                 msgstr: Optional[Tuple[str, ...]] = None, flags = (), comments = ()):
+        self.msgctxt = msgctxt
+        self.msgid = msgid
+        self.msgid_plural = msgid_plural
+        self.msgstr = msgstr if msgstr is not None else (("", "") if msgid_plural is not None else ("",))
+        self.flags = list(flags)
+        self.comments = list(comments)
+
+    @property
+    def key(self) -> Tuple[Optional[str], str]:
+        return self.msgctxt, self.msgid
+
+    def serialize(self) -> str:
+        """ Formats the entry like msgmerge and xgettext do with --no-wrap """
+        content = "".join(f"{comment}\n" for comment in self.comments)
+        if self.flags:
+            content += "#, " + ", ".join(self.flags) + "\n"
+        if self.msgctxt is not None:
+            content += _po_string("msgctxt", self.msgctxt)
+        content += _po_string("msgid", self.msgid)
+        if self.msgid_plural is not None:
+            content += _po_string("msgid_plural", self.msgid_plural)
+            content += "".join(_po_string(f"msgstr[{index}]", msgstr) for index, msgstr in enumerate(self.msgstr))
+        else:
+            content += _po_string("msgstr", self.msgstr[0])
+        return content
+
+
+class _Catalog(object):
+    """
+    In-memory po/pot file: the raw header block and the messages keyed by (msgctxt, msgid), in file order
+
+    Catalogs are built and compared in memory and only serialized once, when they need to be written.
+    """
+
+    def __init__(self, header: Optional[str] = None):
+        self.header = header
+        self._entries: Dict[Tuple[Optional[str], str], _CatalogEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def add(self, msgctxt: Optional[str], msgid: str, msgid_plural: Optional[str] = None, flags = (),
+            msgstr: Optional[Tuple[str, ...]] = None, comments = ()) -> _CatalogEntry:
+        """ Adds a message, a message that is already in the catalog is merged: its flags are extended and a missing
+        plural is filled in """
+        entry = self._entries.get((msgctxt, msgid))
+        if entry is None:
+            entry = _CatalogEntry(msgctxt, msgid, msgid_plural, msgstr, flags, comments)
+            self._entries[entry.key] = entry
+            return entry
+
+        if entry.msgid_plural is None and msgid_plural is not None:
+            entry.msgid_plural = msgid_plural
+            entry.msgstr = msgstr if msgstr is not None else ("", "")
+        entry.flags += [flag for flag in flags if flag not in entry.flags]
+        return entry
+
+    def has_context(self) -> bool:
+        return any(entry.msgctxt is not None for entry in self._entries.values())
+
+    def has_plurals(self) -> bool:
+        return any(entry.msgid_plural is not None for entry in self._entries.values())
+
+    def sort(self) -> None:
+        """ Sorts the messages like gettext does: on the UTF-8 bytes of the msgid, then on the context with messages
+        without context first """
+        self._entries = dict(sorted(self._entries.items(), key = lambda item: (
+            item[0][1].encode("utf-8"), item[0][0] is not None, (item[0][0] or "").encode("utf-8"))))
+
+    def messages(self) -> Dict[Tuple[Optional[str], str], tuple]:
+        """ The content of the catalog that matters to the translations, without the header, comments and order """
+        return {key: (entry.msgid_plural, entry.msgstr, frozenset(entry.flags)) for key, entry in self._entries.items()}
+
+    @property
+    def metadata(self) -> str:
+        """ The decoded msgstr of the header entry """
+        metadata = None
+        for line in (self.header or "").splitlines():
+            keyword_match = _PO_KEYWORD_RE.match(line)
+            continuation_match = _PO_CONTINUATION_RE.match(line)
+            if keyword_match is not None:
+                metadata = _po_unescape(keyword_match.group(2)) if keyword_match.group(1) == "msgstr" else None
+            elif continuation_match is not None and metadata is not None:
+                metadata += _po_unescape(continuation_match.group(1))
+        return metadata or ""
+
+    def same_messages(self, other: "_Catalog") -> bool:
+        return self.messages() == other.messages()
+
+    def serialize(self) -> str:
+        blocks = [self.header] if self.header else []
+        blocks += [entry.serialize() for entry in self._entries.values()]
+        return "\n".join(blocks)
+
+    @classmethod
+    def parse(cls, content: str) -> "_Catalog":
+        """ Parses the content of a po or pot file, obsolete (#~) messages are dropped """
+        catalog = cls()
+        raw_lines = []
+        comments = []
+        flags = []
+        fields = {}
+        last_keyword = None
+
+        def flush():
+            nonlocal raw_lines, comments, flags, fields, last_keyword
+            if "msgid" in fields:
+                if fields["msgid"] == "" and "msgctxt" not in fields and catalog.header is None and not len(catalog):
+                    catalog.header = "".join(f"{line}\n" for line in raw_lines)
+                else:
+                    if "msgid_plural" in fields:
+                        msgstr = tuple(value for keyword, value in sorted(
+                            (int(keyword[7:-1]), value) for keyword, value in fields.items() if keyword.startswith("msgstr[")))
+                    else:
+                        msgstr = (fields.get("msgstr", ""),)
+                    catalog.add(fields.get("msgctxt"), fields["msgid"], fields.get("msgid_plural"), flags, msgstr, comments)
+            raw_lines, comments, flags, fields, last_keyword = [], [], [], {}, None
+
+        for line in content.splitlines():
+            if not line.strip():
+                flush()
+                continue
+            if line.startswith("#~"):
+                continue
+
+            has_msgstr = any(keyword.startswith("msgstr") for keyword in fields)
+            if line.startswith("#"):
+                if has_msgstr:
+                    flush()
+                if line.startswith("#,"):
+                    flags += [flag.strip() for flag in line[2:].split(",") if flag.strip()]
+                else:
+                    comments.append(line)
+                raw_lines.append(line)
+                continue
+
+            keyword_match = _PO_KEYWORD_RE.match(line)
+            if keyword_match is not None:
+                keyword = keyword_match.group(1)
+                if keyword in ("msgctxt", "msgid") and has_msgstr:
+                    flush()
+                fields[keyword] = _po_unescape(keyword_match.group(2))
+                last_keyword = keyword
+                raw_lines.append(line)
+                continue
+
+            continuation_match = _PO_CONTINUATION_RE.match(line)
+            if continuation_match is None or last_keyword is None:
+                raise ValueError(f"Invalid po line: {line}")
+            fields[last_keyword] += _po_unescape(continuation_match.group(1))
+            raw_lines.append(line)
+        flush()
+        return catalog
+
+
+def _mo_content(catalog: _Catalog) -> bytes:
+    """ Compiles a catalog into the GNU .mo format like msgfmt does, fuzzy and untranslated messages are left out """
+    messages = {}
+    if catalog.metadata:
+        messages[b""] = catalog.metadata.encode("utf-8")
+    for entry in catalog:
+        if "fuzzy" in entry.flags or not any(entry.msgstr):
+            continue
+        msgid = entry.msgid if entry.msgid_plural is None else f"{entry.msgid}\0{entry.msgid_plural}"
+        if entry.msgctxt is not None:
+            msgid = f"{entry.msgctxt}\x04{msgid}"
+        messages[msgid.encode("utf-8")] = "\0".join(entry.msgstr).encode("utf-8")
+
+    # The original strings are sorted, the hash table is optional and left out
+    keys = sorted(messages)
+    ids = b""
+    strs = b""
+    offsets = []
+    for key in keys:
+        offsets.append((len(ids), len(key), len(strs), len(messages[key])))
+        ids += key + b"\0"
+        strs += messages[key] + b"\0"
+
+    keys_start = 7 * 4 + 16 * len(keys)
+    values_start = keys_start + len(ids)
+    key_table = []
+    value_table = []
+    for id_offset, id_length, str_offset, str_length in offsets:
+        key_table += [id_length, id_offset + keys_start]
+        value_table += [str_length, str_offset + values_start]
+
+    header = struct.pack("Iiiiiii", 0x950412de, 0, len(keys), 7 * 4, 7 * 4 + len(keys) * 8, 0, 0)
+    return header + struct.pack(f"{len(key_table)}i", *key_table) + struct.pack(f"{len(value_table)}i", *value_table) + ids + strs
+
+
+def _compile_mo_file(job: Tuple[str, str]) -> Tuple[str, Optional[str]]:
+    """ Process pool worker: compiles a po file into a mo file """
+    po_path, mo_path = job
+    try:
+        with open(po_path, "r", encoding = "utf-8") as f:
+            content = _mo_content(_Catalog.parse(f.read()))
+        Path(mo_path).parent.mkdir(parents = True, exist_ok = True)
+        with open(mo_path, "wb") as f:
+            f.write(content)
+        return po_path, None
+    except (ValueError, OSError, UnicodeDecodeError) as e:
+        return po_path, str(e)
+
+
+# Directories that never contain translatable sources, names or paths relative to the source folder
+_DEFAULT_IGNORE_PATTERNS = ("build", "cmake-build-*", ".git", "node_modules", "__pycache__", "venv", ".venv")
+
+
+def _file_kind(name: str) -> str:
+    """ The kind a file is indexed under: its extension, or the full name for the json files with a fixed layout """
+    if name == "plugin.json":
+        return name
+    if name.endswith(".def.json"):
+        return ".def.json"
+    return os.path.splitext(name)[1]
+
+
+class _SourceIndex(object):
+    """
+    Index of the files in the source folder by kind, built with a single walk over the source tree
+
+    Directories matching one of the ignore patterns, on their name or their path relative to the source folder, are not
+    descended into. Files are listed in sorted order, so the extraction input doesn't depend on the file system.
+    """
+
+    def __init__(self, source_folder: Path, ignore_patterns, ignore_folders = ()):
+        self._source_folder = Path(source_folder)
+        self._files: Dict[str, List[Path]] = {}
+        ignore_folders = {os.path.normcase(os.path.abspath(folder)) for folder in ignore_folders}
+
+        for root, dirs, files in os.walk(self._source_folder):
+            dirs[:] = sorted(folder for folder in dirs if not self._is_ignored(Path(root, folder), ignore_patterns, ignore_folders))
+            for name in sorted(files):
+                self._files.setdefault(_file_kind(name), []).append(Path(root, name))
+
+    def _is_ignored(self, folder: Path, ignore_patterns, ignore_folders: Set[str]) -> bool:
+        if os.path.normcase(os.path.abspath(folder)) in ignore_folders:
+            return True
+        relative_path = folder.relative_to(self._source_folder).as_posix()
+        return any(fnmatch.fnmatch(folder.name, pattern) or fnmatch.fnmatch(relative_path, pattern) for pattern in ignore_patterns)
+
+    def files(self, kind: str, folder: Optional[Path] = None) -> List[Path]:
+        """ The indexed files of a kind, optionally only those inside a folder """
+        files = self._files.get(kind, [])
+        if folder is None:
+            return list(files)
+        return [path for path in files if path.is_relative_to(folder)]
+
+    def add(self, path: Path) -> None:
+        files = self._files.setdefault(_file_kind(path.name), [])
+        if path not in files:
+            files.append(path)
+
+    def remove(self, path: Path) -> None:
+        files = self._files.get(_file_kind(path.name), [])
+        if path in files:
+            files.remove(path)
+
+
+class _ExtractionCache(object):
+    """ Persistent cache of the strings extracted from every source file, keyed by path, mtime and content hash """
+    _format_version = 1
+
+    def __init__(self, cache_path: Path):
+        self._cache_path = cache_path
+        self._files = {}
+        self._xgettext_pot = {}
+        self._used = set()
+        try:
+            data = json.loads(cache_path.read_text(encoding = "utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") == self._format_version:
+            self._files = data.get("files", {})
+            self._xgettext_pot = data.get("xgettext_pot", {})
+
+    def _entry(self, path: Path) -> dict:
+        """ The cache entry of a file, the file is only hashed again when its mtime or size changed """
+        key = str(path)
+        self._used.add(key)
+        stat = path.stat()
+        entry = self._files.get(key)
+        if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        if entry is None or entry["sha256"] != sha256:
+            entry = {"sha256": sha256}
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        self._files[key] = entry
+        return entry
+
+    def messages(self, path: Path, language: str) -> Optional[List[tuple]]:
+        """ The messages extracted from the file in an earlier run, None when it changed since """
+        entry = self._entry(path)
+        if entry.get("language") != language or "messages" not in entry:
+            return None
+        return [(msgctxt, msgid, msgid_plural, tuple(flags)) for msgctxt, msgid, msgid_plural, flags in entry["messages"]]
+
+    def store_messages(self, path: Path, language: str, messages: List[tuple]) -> None:
+        entry = self._entry(path)
+        entry["language"] = language
+        entry["messages"] = [[msgctxt, msgid, msgid_plural, list(flags)] for msgctxt, msgid, msgid_plural, flags in messages]
+
+    def definition(self, path: Path) -> Optional[dict]:
+        """ The parsed settings definition of the file in an earlier run, None when it changed since """
+        definition = self._entry(path).get("definition")
+        if definition is not None and "messages" in definition:
+            definition = dict(definition, messages = [tuple(message) for message in definition["messages"]])
+        return definition
+
+    def store_definition(self, path: Path, definition: dict) -> None:
+        self._entry(path)["definition"] = definition
+
+    def is_mo_compiled(self, po_path: Path, mo_path: Path) -> bool:
+        """ Whether the mo file was compiled from the current content of the po file in an earlier run """
+        return self._entry(po_path).get("mo") == str(mo_path) and mo_path.exists()
+
+    def store_mo_compiled(self, po_path: Path, mo_path: Path) -> None:
+        self._entry(po_path)["mo"] = str(mo_path)
+
+    def fingerprint(self, paths: List[Path]) -> str:
+        """ Hash over the paths and contents of a set of files """
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(f"{path}\0{self._entry(path)['sha256']}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def xgettext_pot(self, fingerprint: str) -> Optional[str]:
+        """ The pot content xgettext extracted from the same set of files in an earlier run """
+        if self._xgettext_pot.get("fingerprint") != fingerprint:
+            return None
+        return self._xgettext_pot.get("content")
+
+    def store_xgettext_pot(self, fingerprint: str, content: str) -> None:
+        self._xgettext_pot = {"fingerprint": fingerprint, "content": content}
+
+    def save(self) -> None:
+        """ Writes the cache, forgetting the files that weren't used in this run """
+        data = {"version": self._format_version,
+                "files": {key: entry for key, entry in self._files.items() if key in self._used},
+                "xgettext_pot": self._xgettext_pot}
+        self._cache_path.parent.mkdir(parents = True, exist_ok = True)
+        self._cache_path.write_text(json.dumps(data), encoding = "utf-8")
+
+
+class _Profiler(object):
+    """ Wall time per stage and counters (files, subprocesses, bytes written) of a translation extraction run """
+
+    def __init__(self):
+        self._stages: Dict[str, float] = {}
+        self._counters: Dict[str, int] = collections.Counter()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stages[name] = self._stages.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def report(self) -> dict:
+        return {"total_seconds": round(time.perf_counter() - self._start, 6),
+                "stages": {name: round(seconds, 6) for name, seconds in self._stages.items()},
+                "counters": dict(sorted(self._counters.items()))}
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [f"Translation extraction took {report['total_seconds']:.3f}s"]
+        lines += [f"  {name:<24} {seconds:8.3f}s" for name, seconds in report["stages"].items()]
+        lines += [f"  {counter:<24} {value:>9}" for counter, value in report["counters"].items()]
+        return "\n".join(lines)
+
+
 # Part of this script generates a POT file from a JSON settings file. It
 # has been adapted from createjsoncontext.py of KDE's translation
 # scripts. It extracts the "label" and "description" values of
@@ -21,47 +794,85 @@ class ExtractTranslations(object):
         self._translations_root_path = Path(self._conanfile.source_folder).joinpath("resources", "i18n")
         self._all_strings_pot_path = self._translations_root_path.joinpath(
             self._conanfile.name + ".pot")  # pot file containing all strings untranslated
-        self._pot_content = {}
-        self._pot_are_updated = False
+        self._previous_catalogs: Dict[str, _Catalog] = {}
+        self._catalogs: Dict[str, _Catalog] = {}
+        self._updated_pot_files = set()
+        # "xgettext" shells out to gettext, "native" extracts the Python and QML strings in-process
+        self._backend = self._conanfile.conf.get("user.translationextractor:backend", default = "xgettext", check_type = str)
+        self._cache = _ExtractionCache(Path(self._conanfile.build_folder, "translationextractor_cache.json"))
+        self._ignore_patterns = list(_DEFAULT_IGNORE_PATTERNS) + self._conanfile.conf.get(
+            "user.translationextractor:ignore", default = [], check_type = list)
+        self._index: Optional[_SourceIndex] = None
+        # Prints the time spent per stage, optionally writes it as a JSON report as well
+        self._profile_report = self._conanfile.conf.get("user.translationextractor:profile_report", check_type = str)
+        self._profile = self._conanfile.conf.get("user.translationextractor:profile", default = self._profile_report is not None,
+                                                 check_type = bool)
+        self._profiler = _Profiler()
+        # Compiles the po files of all languages into <build folder>/resources/i18n/<language>/LC_MESSAGES/<name>.mo
+        self._compile_mo = self._conanfile.conf.get("user.translationextractor:compile_mo", default = False, check_type = bool)
+        self._mo_root_path = Path(self._conanfile.build_folder, "resources", "i18n")
+
+    def _run(self, command: str, **kwargs) -> None:
+        self._profiler.count("subprocesses")
+        self._conanfile.run(command, env = "conanbuild", **kwargs)
+
+    def _save(self, path, content: str) -> None:
+        self._profiler.count("bytes_written", len(content.encode("utf-8")))
+        save(self._conanfile, path, content)
+
+    def _update_po_file(self, pot_file: Path, po_file: Path) -> str:
+        """ Merges the strings of a pot file into the po file of a language, returns the output of the gettext tools """
+        output = io.StringIO()
+        if not po_file.exists():
+            po_file.touch()
+            self._run(f"msginit --no-translator -i {pot_file} -o {po_file} --locale=en", stdout=output, stderr=output)
+        self._run(f"msgmerge --add-location=never --no-wrap --no-fuzzy-matching --sort-output -o {po_file} {po_file} {pot_file}",
+                  stdout=output, stderr=output)
+        self._profiler.count("bytes_written", po_file.stat().st_size)
+        return output.getvalue()
 
     def _update_po_files_all_languages(self) -> None:
-        """ Updates all po files in translation_root_path with new strings mapped to blank translations."""
-        for pot_file in Path(self._translations_root_path).rglob("*.pot"):
-            for lang_folder in [d for d in self._translations_root_path.iterdir() if d.is_dir()]:
+        """ Updates the po files in translation_root_path with new strings mapped to blank translations. Only the po
+        files of pot files that changed, or po files that don't exist yet, are merged, concurrently. """
+        if not self._translations_root_path.exists():
+            return
+        lang_folders = [d for d in self._translations_root_path.iterdir() if d.is_dir()]
+        merges = []
+        for pot_file in self._index.files(".pot", self._translations_root_path):
+            for lang_folder in lang_folders:
                 po_file = lang_folder / pot_file.with_suffix('.po').name
-                self._conanfile.output.info(f"Updating {po_file}")
-                if lang_folder.is_dir() and not po_file.exists():
-                    po_file.touch()
-                    self._conanfile.run(
-                        f"msginit --no-translator -i {pot_file} -o {po_file} --locale=en", env="conanbuild")
-                self._conanfile.run(
-                    f"msgmerge --add-location=never --no-wrap --no-fuzzy-matching --sort-output -o {po_file} {po_file} {pot_file}",
-                    env="conanbuild")
-
-    def _remove_pot_header(self, content: str) -> str:
-        return "".join(content.splitlines(keepends=True)[20:])
+                if str(pot_file) in self._updated_pot_files or not po_file.exists():
+                    merges.append((pot_file, po_file))
+        if not merges:
+            return
 
-    def _remove_comments(self, content: str) -> str:
-        return "".join([line for line in content.splitlines(keepends=True) if not line.startswith("#")])
+        self._conanfile.output.info(f"Updating {len(merges)} po files...")
+        self._profiler.count("po_files_merged", len(merges))
+        with ThreadPoolExecutor(max_workers = max(1, build_jobs(self._conanfile) or 1)) as executor:
+            outputs = list(executor.map(lambda merge: self._update_po_file(*merge), merges))
+        for (_, po_file), output in zip(merges, outputs):
+            self._index.add(po_file)
+            self._conanfile.output.info(f"Updated {po_file}")
+            if output.strip():
+                self._conanfile.output.info(output.rstrip())
 
     def _load_pot_content(self) -> None:
-        for pot_file in Path(self._translations_root_path).rglob("*.pot"):
-            # only store the content of the pot file, not the header
-            self._pot_content[str(pot_file)] = load(self._conanfile, str(pot_file))
-
-    def _is_pot_content_changed(self, pot_file: str) -> bool:
-        if pot_file not in self._pot_content:
-            return False
-        return self._remove_comments(self._remove_pot_header(self._pot_content[pot_file])) != self._remove_comments(
-            self._remove_pot_header(load(self._conanfile, pot_file)))
+        """ Parses the current pot files, once, to compare the newly extracted strings against """
+        for pot_file in self._index.files(".pot", self._translations_root_path):
+            try:
+                self._previous_catalogs[str(pot_file)] = _Catalog.parse(load(self._conanfile, str(pot_file)))
+            except ValueError as e:
+                self._conanfile.output.warning(f"Unable to parse {pot_file}, it will be regenerated: {e}")
 
     def _only_update_pot_files_when_changed(self) -> None:
-        """restore the previous content of the pot files if the content hasn't changed"""
-        for pot_file in Path(self._translations_root_path).rglob("*.pot"):
-            if self._is_pot_content_changed(str(pot_file)):
-                self._pot_are_updated = True
-            elif str(pot_file) in self._pot_content:
-                save(self._conanfile, str(pot_file), self._pot_content[str(pot_file)])
+        """ Only write the pot files of which the messages changed, the others are left untouched """
+        for pot_file, catalog in self._catalogs.items():
+            previous_catalog = self._previous_catalogs.get(pot_file)
+            if previous_catalog is None or not previous_catalog.same_messages(catalog):
+                self._save(pot_file, catalog.serialize())
+                self._profiler.count("pot_files_written")
+                self._index.add(Path(pot_file))
+                self._updated_pot_files.add(pot_file)
 
     def _extract_strings_to_pot_files(self) -> None:
         """
@@ -69,77 +880,156 @@ class ExtractTranslations(object):
         used in python and qml in the project. It also checks the project for JSON files with 'settings' in the root node
         and extracts these for translation as well.
         """
-        save(self._conanfile, self._all_strings_pot_path, "")  # Clear output file
+        python_files = self._extract_source_files("python", ".py")
+        qml_files = self._extract_source_files("qml", ".qml")
+        self._profiler.count("python_files", len(python_files))
+        self._profiler.count("qml_files", len(qml_files))
+        if self._backend == "native":
+            with self._profiler.stage("extract_native"):
+                self._extract_native(python_files, qml_files)
+        else:
+            self._extract_xgettext(python_files, qml_files)
 
-        self._extract_python()
-        self._extract_qml()
-        self._extract_plugin()
-        self._extract_settings()
+        with self._profiler.stage("extract_plugin"):
+            self._extract_plugin()
+        with self._profiler.stage("extract_settings"):
+            self._extract_settings()
 
-    def _extract_source_files(self, prefix, extension_wildcard):
+    def _extract_source_files(self, prefix, extension):
         source_files = []
 
         key = f"{prefix}_translation_source_folders"
         if self._conanfile.conan_data is not None and key in self._conanfile.conan_data:
             for translation_folder in self._conanfile.conan_data[key]:
-                source_files += Path(self._conanfile.source_folder, translation_folder).rglob(extension_wildcard)
+                source_files += self._index.files(extension, Path(self._conanfile.source_folder, translation_folder))
 
         return source_files
 
-    def _extract_python(self) -> None:
+    def _run_xgettext(self, language: str, source_files: List[Path], pot_path: Path) -> None:
+        """ Extracts the i18n strings of all source files with a single xgettext run, the files are passed through a
+        --files-from list instead of spawning xgettext (and re-sorting the pot file) for every file """
+        if not source_files:
+            return
+
+        with tempfile.TemporaryDirectory() as files_from_folder:
+            files_from_path = Path(files_from_folder, f"{language}_files.txt")
+            save(self._conanfile, files_from_path, "".join(f"{path}\n" for path in source_files))
+            self._run(
+                f"xgettext --from-code=UTF-8 --join-existing --add-location=never --sort-output --language={language} --no-wrap -ki18n:1 -ki18nc:1c,2 -ki18np:1,2 -ki18ncp:1c,2,3 -o {pot_path} --files-from={files_from_path}")
+
+    def _extract_python(self, source_files: List[Path], pot_path: Path) -> None:
         """ Extract i18n strings from all .py files"""
-        for path in self._extract_source_files("python", "*.py"):
-            self._conanfile.run(
-                f"xgettext --from-code=UTF-8 --join-existing --add-location=never --sort-output --language=python --no-wrap -ki18n:1 -ki18nc:1c,2 -ki18np:1,2 -ki18ncp:1c,2,3 -o {self._all_strings_pot_path} {path}",
-                env="conanbuild")
+        self._run_xgettext("python", source_files, pot_path)
 
-    def _extract_qml(self) -> None:
+    def _extract_qml(self, source_files: List[Path], pot_path: Path) -> None:
         """ Extract all i18n strings from qml files"""
-        for path in self._extract_source_files("qml", "*.qml"):
-            self._conanfile.run(
-                f"xgettext --from-code=UTF-8 --join-existing --add-location=never --sort-output --language=javascript --no-wrap -ki18n:1 -ki18nc:1c,2 -ki18np:1,2 -ki18ncp:1c,2,3 -o {self._all_strings_pot_path} {path}",
-                env="conanbuild")
+        self._run_xgettext("javascript", source_files, pot_path)
+
+    def _extract_xgettext(self, python_files: List[Path], qml_files: List[Path]) -> None:
+        """ Extract the i18n strings with xgettext, unless none of the source files changed since the previous run """
+        fingerprint = self._cache.fingerprint(python_files + qml_files)
+        content = self._cache.xgettext_pot(fingerprint)
+        if content is None:
+            # xgettext writes to a scratch file in the build folder, the pot file itself is only written when it changed
+            pot_path = Path(self._conanfile.build_folder, self._all_strings_pot_path.name)
+            save(self._conanfile, pot_path, "")
+            with self._profiler.stage("extract_python"):
+                self._extract_python(python_files, pot_path)
+            with self._profiler.stage("extract_qml"):
+                self._extract_qml(qml_files, pot_path)
+            content = load(self._conanfile, pot_path)
+            self._cache.store_xgettext_pot(fingerprint, content)
+        else:
+            self._profiler.count("cached_source_files", len(python_files) + len(qml_files))
+        self._catalogs[str(self._all_strings_pot_path)] = _Catalog.parse(content)
+
+    def _extract_native(self, python_files: List[Path], qml_files: List[Path]) -> None:
+        """ Extract the i18n strings from all .py and .qml files in-process. Only files that changed since the previous
+        run are scanned, spread over a process pool, the others are served from the cache. """
+        file_messages = []
+        jobs = []
+        for path, language in [(path, "python") for path in python_files] + [(path, "javascript") for path in qml_files]:
+            cached_messages = self._cache.messages(path, language)
+            if cached_messages is None:
+                jobs.append((str(path), language))
+            else:
+                file_messages.append(cached_messages)
+        self._profiler.count("cached_source_files", len(file_messages))
+
+        if jobs:
+            with _executor(max(1, build_jobs(self._conanfile) or 1)) as executor:
+                for (path, language), (_, extracted, error) in zip(jobs, executor.map(_extract_file_messages, jobs, chunksize = 16)):
+                    if error is not None:
+                        self._conanfile.output.warning(f"Unable to extract strings from {path}: {error}")
+                    else:
+                        self._cache.store_messages(Path(path), language, extracted)
+                    file_messages.append(extracted)
+
+        catalog = _Catalog()
+        for extracted in file_messages:
+            for msgctxt, msgid, msgid_plural, flags in extracted:
+                catalog.add(msgctxt, msgid, msgid_plural, flags)
+        catalog.sort()
+        for entry in catalog:
+            entry.flags.sort()
+        catalog.header = _xgettext_header(catalog.has_plurals())
+        self._catalogs[str(self._all_strings_pot_path)] = catalog
 
     def _extract_plugin(self) -> None:
         """ Extract the name and description from all plugins """
-        plugin_paths = [path for path in Path(self._conanfile.source_folder).rglob("plugin.json") if "test" not in str(path)]
+        plugin_paths = [path for path in self._index.files("plugin.json") if "test" not in str(path)]
+        self._profiler.count("plugin_files", len(plugin_paths))
+        catalog = self._catalogs.setdefault(str(self._all_strings_pot_path), _Catalog())
+        if catalog.header is None:
+            catalog.header = _xgettext_header(catalog.has_plurals())
         for path in plugin_paths:
-            translation_entries = ""
-
             # Extract translations from plugin.json
             plugin_dict = json.loads(load(self._conanfile, path), object_pairs_hook=collections.OrderedDict)
             if "name" not in plugin_dict or (
                     "api" not in plugin_dict and "supported_sdk_versions" not in plugin_dict) or "version" not in plugin_dict:
                 self._conanfile.output.warn(f"The plugin.json is invalid, ignoring it: {path}")
             else:
+                # Add plugin name & description to the output pot file
                 if "description" in plugin_dict:
-                    translation_entries += self._create_translation_entry("description", plugin_dict["description"])
+                    self._create_translation_entry(catalog, "description", plugin_dict["description"])
                 if "name" in plugin_dict:
-                    translation_entries += self._create_translation_entry("name", plugin_dict["name"])
-
-            # Write plugin name & description to output pot file
-            if translation_entries:
-                save(self._conanfile, self._all_strings_pot_path, translation_entries, append=True)
+                    self._create_translation_entry(catalog, "name", plugin_dict["name"])
 
     def _extract_settings(self) -> None:
-        """ Extract strings from settings json files to pot file with a matching name """
-        setting_json_paths = [path for path in self._conanfile.source_path.rglob("*.def.json") if "test" not in str(path)]
-        setting_json_data = []
+        """ Extract strings from settings json files to pot file with a matching name. The definitions are parsed in a
+        process pool, definitions that didn't change since the previous run are served from the cache. """
+        setting_json_paths = [path for path in self._index.files(".def.json") if "test" not in str(path)]
+        definitions = {}
+        jobs = []
         for json_path in setting_json_paths:
-            setting_dict = json.loads(load(self._conanfile, json_path), object_pairs_hook = collections.OrderedDict)
-            setting_json_data.append((json_path, setting_dict))
+            definition = self._cache.definition(json_path)
+            if definition is None:
+                jobs.append(str(json_path))
+            else:
+                definitions[json_path] = definition
+        self._profiler.count("definition_files", len(setting_json_paths))
+        self._profiler.count("cached_definition_files", len(definitions))
+
+        if jobs:
+            with _executor(max(1, build_jobs(self._conanfile) or 1)) as executor:
+                for path, definition, error in executor.map(_parse_definition, jobs, chunksize = 8):
+                    if error is not None:
+                        raise ValueError(f"Unable to parse the settings definition {path}: {error}")
+                    self._cache.store_definition(Path(path), definition)
+                    definitions[Path(path)] = definition
 
+        setting_json_data = [(json_path, definitions[json_path]) for json_path in setting_json_paths]
         variants_names = self._extract_variants_names(setting_json_data)
-        for json_path, setting_dict in setting_json_data:
-            self._write_setting_text(json_path, setting_dict, self._translations_root_path, variants_names)
+        for json_path, definition in setting_json_data:
+            self._write_setting_text(json_path, definition, self._translations_root_path, variants_names)
 
     def _extract_variants_names(self, setting_json_data: List[tuple[Path, dict[str, Any]]]) -> Set[str]:
-        """ Extract all existing variants from settings json files """
+        """ Extract all existing variants from the parsed settings definitions """
         variants_names = set()
 
-        for _, setting_dict in setting_json_data:
-            if "metadata" in setting_dict:
-                setting_metadata = setting_dict["metadata"]
+        for _, definition in setting_json_data:
+            if "metadata" in definition:
+                setting_metadata = definition["metadata"]
 
                 variants_name = None
                 if "variants_name" in setting_metadata:
@@ -154,59 +1044,28 @@ class ExtractTranslations(object):
 
         return variants_names
 
-    def _write_setting_text(self, json_path: Path, setting_dict: dict[str, Any], destination_path: Path, variants_names: Set[str]) -> bool:
-        """ Writes settings text from json file to pot file. Returns true if a file was written. """
-        if "inherits" not in setting_dict:
-            if "settings" in setting_dict:
-                settings = setting_dict["settings"]
-            else:
-                settings = setting_dict
-
-            translation_entries = self._process_settings(settings)
+    def _write_setting_text(self, json_path: Path, definition: dict[str, Any], destination_path: Path, variants_names: Set[str]) -> bool:
+        """ Adds the pot catalog of the settings text from a parsed definition. Returns true if a catalog was added. """
+        if "inherits" not in definition:
+            catalog = _Catalog(self._create_pot_header())
+            for msgctxt, msgid in definition["messages"]:
+                catalog.add(msgctxt, msgid)
 
             if json_path.name == "fdmprinter.def.json":
-                translation_entries += self._process_variants_names(variants_names)
+                self._process_variants_names(catalog, variants_names)
 
             output_pot_path = Path(destination_path).joinpath(
                 json_path.name + ".pot")  # Create a pot with a matching filename in the destination path
-            content = self._create_pot_header() + translation_entries
-            save(self._conanfile, output_pot_path, content)
+            self._catalogs[str(output_pot_path)] = catalog
             return True
         return False
 
-    def _process_variants_names(self, variants_names: Set[str]) -> str:
-        translation_entries = ""
-
-        for variant_name in variants_names:
-            translation_entries += self._create_translation_entry("variant_name", variant_name)
-
-        return translation_entries
+    def _process_variants_names(self, catalog: _Catalog, variants_names: Set[str]) -> None:
+        for variant_name in sorted(variants_names):
+            self._create_translation_entry(catalog, "variant_name", variant_name)
 
-    def _process_settings(self, settings) -> str:
-        translation_entries = ""
-
-        for name, value in settings.items():
-            if "label" in value:
-                translation_entries += self._create_setting_translation_entry(name, "label", value["label"])
-            if "description" in value:
-                translation_entries += self._create_setting_translation_entry(name, "description", value["description"])
-            if "warning_description" in value:
-                translation_entries += self._create_setting_translation_entry(name, "warning_description", value["warning_description"])
-            if "error_description" in value:
-                translation_entries += self._create_setting_translation_entry(name, "error_description", value["error_description"])
-            if "options" in value:
-                for item, description in value["options"].items():
-                    translation_entries += self._create_setting_translation_entry(name, "option {0}".format(item), description)
-            if "children" in value:
-                translation_entries += self._process_settings(value["children"])
-
-        return translation_entries
-
-    def _create_setting_translation_entry(self, setting: str, field: str, value: str) -> str:
-        return "msgctxt \"{0} {1}\"\nmsgid \"{2}\"\nmsgstr \"\"\n\n".format(setting, field, value.replace("\n", "\\n").replace("\"", "\\\""))
-
-    def _create_translation_entry(self, field: str, value: str) -> str:
-        return "\nmsgctxt \"{0}\"\nmsgid \"{1}\"\nmsgstr \"\"\n".format(field, value.replace("\n", "\\n").replace("\"", "\\\""))
+    def _create_translation_entry(self, catalog: _Catalog, field: str, value: str) -> None:
+        catalog.add(field, value)
 
     def _create_pot_header(self) -> str:
         """ Creates a pot file header """
@@ -222,33 +1081,76 @@ class ExtractTranslations(object):
         header += "\"MIME-Version: 1.0\\n\"\n"
         header += "\"Content-Type: text/plain; charset=UTF-8\\n\"\n"
         header += "\"Content-Transfer-Encoding: 8bit\\n\"\n"
-        header += "\n"
-        header += "\n"
-        header += "\n"
-        header += "\n"
-        header += "\n"
-        header += "\n"
         return header
 
     def _sanitize_pot_files(self) -> None:
-        """ Sanitize all pot files """
-        for path in self._translations_root_path.rglob("*.pot"):
-            content = load(self._conanfile, path)
-            if "msgctxt" not in content:
-                self._conanfile.output.warn(f"Removing empty pot file: {path}")
-                rm(self._conanfile, path.name, path.parent)
-            else:
-                save(self._conanfile, path,
-                     content.replace(f"#: {self._conanfile.source_folder}/", "#: ").replace("charset=CHARSET", "charset=UTF-8"))
+        """ Sanitize all extracted pot catalogs """
+        for pot_file, catalog in list(self._catalogs.items()):
+            if not catalog.has_context():
+                del self._catalogs[pot_file]
+                if Path(pot_file).exists():
+                    self._conanfile.output.warn(f"Removing empty pot file: {pot_file}")
+                    rm(self._conanfile, Path(pot_file).name, Path(pot_file).parent)
+                    self._index.remove(Path(pot_file))
+                continue
+
+            if catalog.header is not None:
+                catalog.header = catalog.header.replace("charset=CHARSET", "charset=UTF-8")
+            for entry in catalog:
+                entry.comments = [comment.replace(f"#: {self._conanfile.source_folder}/", "#: ") for comment in entry.comments]
 
     def generate(self):
-        self._load_pot_content()
+        # A single walk over the source tree, shared by all the stages. The build folder is skipped when it is located
+        # inside the source folder.
+        with self._profiler.stage("index"):
+            self._index = _SourceIndex(Path(self._conanfile.source_folder), self._ignore_patterns,
+                                       ignore_folders = [self._conanfile.build_folder])
+        with self._profiler.stage("load_pot"):
+            self._load_pot_content()
         self._extract_strings_to_pot_files()
-        self._sanitize_pot_files()
-        self._only_update_pot_files_when_changed()
-        if self._pot_are_updated:
+        with self._profiler.stage("sanitize_pot"):
+            self._sanitize_pot_files()
+        with self._profiler.stage("write_pot"):
+            self._only_update_pot_files_when_changed()
+        if self._updated_pot_files:
             self._conanfile.output.info("Translation Templates contain new strings. Updating po files...")
+        with self._profiler.stage("update_po"):
             self._update_po_files_all_languages()
+        if self._compile_mo:
+            with self._profiler.stage("compile_mo"):
+                self._compile_mo_files()
+        self._cache.save()
+        self._report_profile()
+
+    def _compile_mo_files(self) -> None:
+        """ Compiles the po files of all languages to mo files, concurrently. Po files of which the content didn't change
+        since they were last compiled are skipped. """
+        jobs = []
+        for po_file in self._index.files(".po", self._translations_root_path):
+            mo_file = self._mo_root_path.joinpath(po_file.parent.name, "LC_MESSAGES", po_file.with_suffix(".mo").name)
+            if not self._cache.is_mo_compiled(po_file, mo_file):
+                jobs.append((str(po_file), str(mo_file)))
+        self._profiler.count("mo_files_compiled", len(jobs))
+        if not jobs:
+            return
+
+        self._conanfile.output.info(f"Compiling {len(jobs)} mo files...")
+        with _executor(max(1, build_jobs(self._conanfile) or 1)) as executor:
+            for (po_file, mo_file), (_, error) in zip(jobs, executor.map(_compile_mo_file, jobs, chunksize = 4)):
+                if error is not None:
+                    self._conanfile.output.warning(f"Unable to compile {po_file}: {error}")
+                    continue
+                self._cache.store_mo_compiled(Path(po_file), Path(mo_file))
+                self._profiler.count("bytes_written", Path(mo_file).stat().st_size)
+
+    def _report_profile(self) -> None:
+        if not self._profile:
+            return
+        self._conanfile.output.info(self._profiler.summary())
+        if self._profile_report is not None:
+            report_path = Path(self._conanfile.build_folder, self._profile_report)
+            save(self._conanfile, report_path, json.dumps(self._profiler.report(), indent = 2))
+            self._conanfile.output.info(f"Wrote the translation extraction profile to {report_path}")
 
 
 class Pkg(ConanFile):
@@ -0,0 +1,51 @@
+"""Usage:
+  benchmark_wheels.py [options] [<document>]
+  benchmark_wheels.py -h | --help | --version
+
+Times building the wheel index and selecting the conandata sources from a PyPI JSON document. Defaults to the recorded
+numpy document in fixtures/pypi_numpy.json, trimmed to its 20 most recent releases and the fields the index reads.
+
+Options:
+  --repeat=<n>  Number of timed runs, the fastest one is reported [default: 20]
+"""
+import json
+import time
+
+from pathlib import Path
+
+from docopt import docopt
+
+from wheels import WheelIndex
+
+DEFAULT_DOCUMENT = Path(__file__).resolve().parent.joinpath("fixtures", "pypi_numpy.json")
+
+
+def build_conandata(releases: dict) -> dict:
+    index = WheelIndex()
+    for release, release_files in releases.items():
+        index.add_release_files(release, release_files)
+    return index.conandata()
+
+
+def main(document_path: Path, repeat: int):
+    with open(document_path, "rb") as f:
+        releases = json.load(f)["releases"]
+    files = sum(len(release_files) for release_files in releases.values())
+
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        conandata = build_conandata(releases)
+        timings.append(time.perf_counter() - start)
+
+    sources = sum(len(by_python_version) for by_os in conandata.values() for by_python_version in by_os.values())
+    best = min(timings)
+    print(f"{document_path.name}: {len(releases)} releases, {files} files -> {sources} conandata sources")
+    print(f"best {best * 1000:.2f} ms, median {sorted(timings)[len(timings) // 2] * 1000:.2f} ms, "
+          f"{files / best:,.0f} files/s over {len(timings)} runs")
+
+
+if __name__ == '__main__':
+    kwargs = docopt(__doc__, version = '0.1.0')
+    main(document_path = Path(kwargs["<document>"]) if kwargs["<document>"] else DEFAULT_DOCUMENT,
+         repeat = int(kwargs["--repeat"]))
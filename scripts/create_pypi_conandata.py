@@ -1,13 +1,43 @@
 """Usage:
-  create_pypi_conandata.py <name> <location>
+  create_pypi_conandata.py batch [options] <location> <name>...
+  create_pypi_conandata.py [options] <name> <location>
   create_pypi_conandata.py -h | --help | --version
+
+The batch command fetches the metadata of all the given packages concurrently and writes a conandata.yml for each.
+
+Options:
+  --versions=<specifier>    Only include the releases matching a PEP 440 version specifier, e.g. ">=5.2,<6"
+  --latest=<n>              Only include the n most recent releases, according to PEP 440 ordering
+  --pre                     Include pre-releases when filtering releases
+  --merge                   Add the new releases to an existing conandata.yml, instead of rewriting it
+  --stream                  Parse the PyPI documents incrementally, keeping memory bounded for projects with many
+                            releases (requires ijson)
+  --mirror=<dir>            Download the selected wheels into a content-addressed store, verifying their sha256, and
+                            point the conandata to the mirror
+  --mirror-url=<url>        URL the mirror store is served from (defaults to the file URI of the store)
+  -j <jobs>, --jobs=<jobs>  Number of concurrent requests to the package index and downloads [default: 8]
+  --index-url=<url>         Base URL of the PyPI JSON API [default: https://pypi.org/pypi]
+  --cache=<dir>             Directory caching the index responses (defaults to .pypi_cache in the root of the index)
 """
-import requests
+import itertools
+import json
 import yaml
 
 from pathlib import Path
+from typing import Collection, Iterable, Iterator, Optional, Set, Tuple
 
 from docopt import docopt
+from packaging.specifiers import SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+from pypi_client import PyPIClient
+from wheel_mirror import WheelMirror
+from wheels import WheelIndex
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 def quoted_presenter(dumper, data):
@@ -19,86 +49,132 @@ def quoted_presenter(dumper, data):
 yaml.add_representer(str, quoted_presenter)
 
 
-def main(name: str, location: str):
-    resp = requests.get(f"https://pypi.org/pypi/{name}/json").json()
-
-    conandata = {}
-    if resp["releases"] is not None:
-        for release, release_data in resp["releases"].items():
-            for data in release_data:
-                if data["packagetype"] == "bdist_wheel":
-                    split_filename = data["filename"].removesuffix(".whl").split("-")
-                    print(split_filename)
-                    if str(release) not in conandata:
-                        conandata[str(release)] = {}
-
-                    if "abi3" in split_filename[-2] or "cp" in split_filename[-2] or "none" in split_filename[-2]:
-                        # This wheel distribution is universal or CPython ABI compatible
-                        if "py" in split_filename[-3] or "cp" in split_filename[-3]:
-                            # This wheel distribution is Python compatible
-                            python_version = split_filename[-3].split(".")[-1][2:]
-                            if len(python_version) > 1:
-                                python_version = python_version[0] + "." + python_version[1:]
-                            else:
-                                python_version = python_version + ".0"
-
-                            if "any" == split_filename[-1]:
-                                if "Any" not in conandata[str(release)]:
-                                    conandata[str(release)]["Any"] = {}
-
-                                if python_version not in conandata[str(release)]["Any"]:
-                                    conandata[str(release)]["Any"][python_version] = {}
-
-                                conandata[str(release)]["Any"][python_version]["url"] = data["url"]
-                                conandata[str(release)]["Any"][python_version]["sha256"] = str(data["digests"]["sha256"])
-
-                            if "manylinux" in split_filename[-1]:
-                                if "Linux" not in conandata[str(release)]:
-                                    conandata[str(release)]["Linux"] = {}
-
-                                if python_version not in conandata[str(release)]["Linux"]:
-                                    conandata[str(release)]["Linux"][python_version] = {}
-
-                                if "x86_64" in split_filename[-1]:
-                                    conandata[str(release)]["Linux"][python_version]["url"] = data["url"]
-                                    conandata[str(release)]["Linux"][python_version]["sha256"] = str(data["digests"]["sha256"])
-
-                            if "macosx" in split_filename[-1]:
-                                if "Darwin" not in conandata[str(release)]:
-                                    conandata[str(release)]["Darwin"] = {}
-
-                                if python_version not in conandata[str(release)]["Darwin"]:
-                                    conandata[str(release)]["Darwin"][python_version] = {}
-
-                                if "x86_64" in split_filename[-1]:  # Prefer x86_64 over
-                                    conandata[str(release)]["Darwin"][python_version]["url"] = data["url"]
-                                    conandata[str(release)]["Darwin"][python_version]["sha256"] = str(data["digests"]["sha256"])
-                                elif "intel"in split_filename[-1]:
-                                    conandata[str(release)]["Darwin"][python_version]["url"] = data["url"]
-                                    conandata[str(release)]["Darwin"][python_version]["sha256"] = str(data["digests"]["sha256"])
-                                elif "universal2" in split_filename[-1]:
-                                    conandata[str(release)]["Darwin"][python_version]["url"] = data["url"]
-                                    conandata[str(release)]["Darwin"][python_version]["sha256"] = str(data["digests"]["sha256"])
-
-                            if "win_amd64" in split_filename[-1]:
-                                if "Windows" not in conandata[str(release)]:
-                                    conandata[str(release)]["Windows"] = {}
-
-                                if python_version not in conandata[str(release)]["Windows"]:
-                                    conandata[str(release)]["Windows"][python_version] = {}
-
-                                conandata[str(release)]["Windows"][python_version]["url"] = data["url"]
-                                conandata[str(release)]["Windows"][python_version]["sha256"] = str(data["digests"]["sha256"])
-
-        result_path = Path(location)
-        result_path.mkdir(exist_ok = True)
-        conandata_path = result_path.joinpath(name, "conandata.yml")
-        conandata_path.unlink(missing_ok = True)
-        print(f"Writing conandata to: {conandata_path}")
-        with open(conandata_path, "w") as f:
-            yaml.dump({"sources": conandata}, f)
+def load_releases(document_path: Path) -> dict:
+    """ Loads the whole PyPI document and returns the files of each release """
+    with open(document_path, "rb") as f:
+        resp = json.load(f)
+    return resp["releases"] or {}
+
+
+def iter_release_versions_streaming(document_path: Path) -> Iterator[str]:
+    """ Yields the release versions of the PyPI document without building any of the release files """
+    if ijson is None:
+        raise RuntimeError("Streaming the PyPI documents requires ijson, install it with: pip install ijson")
+    with open(document_path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "releases" and event == "map_key":
+                yield value
+
+
+def iter_releases_streaming(document_path: Path, selected: Collection[str]) -> Iterator[Tuple[str, list]]:
+    """ Yields the files of each selected release while parsing the PyPI document, only a single release is held in
+    memory """
+    if ijson is None:
+        raise RuntimeError("Streaming the PyPI documents requires ijson, install it with: pip install ijson")
+    with open(document_path, "rb") as f:
+        for release, release_data in ijson.kvitems(f, "releases"):
+            if release in selected:
+                yield release, release_data
+
+
+def select_releases(releases: Iterable[str], specifier: Optional[SpecifierSet], latest: Optional[int], pre: bool,
+                    exclude: Collection[str]) -> Set[str]:
+    """ Applies the version filters to the release versions and leaves out the excluded releases. Releases that are not
+    valid PEP 440 versions are only kept when no filter is given. """
+    releases = [str(release) for release in releases]
+    if specifier is None and latest is None:
+        return set(releases) - set(exclude)
+
+    versions = []
+    for release in releases:
+        try:
+            version = Version(release)
+        except InvalidVersion:
+            continue
+        if specifier is not None and not specifier.contains(version, prereleases = pre or None):
+            continue
+        if specifier is None and version.is_prerelease and not pre:
+            continue
+        versions.append((version, release))
+
+    versions.sort(reverse = True)
+    if latest is not None:
+        versions = versions[:latest]
+    return {release for _, release in versions if release not in exclude}
+
+
+def load_existing_sources(name: str, location: str) -> dict:
+    conandata_path = Path(location).joinpath(name, "conandata.yml")
+    if not conandata_path.exists():
+        return {}
+    with open(conandata_path, "r") as f:
+        return (yaml.safe_load(f) or {}).get("sources") or {}
+
+
+def iter_conandata(releases: Iterable[Tuple[str, list]]) -> Iterator[Tuple[str, dict]]:
+    """ Yields the conandata sources entry of every release that has compatible wheels """
+    for release, release_data in releases:
+        index = WheelIndex()
+        index.add_release_files(str(release), release_data)
+        entry = index.conandata().get(str(release))
+        if entry:
+            yield str(release), entry
+
+
+def write_conandata(name: str, location: str, entries: Iterable[Tuple[str, dict]]) -> None:
+    result_path = Path(location)
+    conandata_path = result_path.joinpath(name, "conandata.yml")
+    conandata_path.parent.mkdir(parents = True, exist_ok = True)
+    conandata_path.unlink(missing_ok = True)
+    print(f"Writing conandata to: {conandata_path}")
+    with open(conandata_path, "w") as f:
+        # Entries are written as they come in, each release is dumped as a part of the sources mapping
+        written = False
+        for release, entry in entries:
+            if not written:
+                f.write("\"sources\":\n")
+                written = True
+            f.write(yaml.dump({"sources": {release: entry}}).split("\n", 1)[1])
+        if not written:
+            yaml.dump({"sources": {}}, f)
+
+
+def main(names: Iterable[str], location: str, client: PyPIClient, stream: bool, specifier: Optional[SpecifierSet],
+         latest: Optional[int], pre: bool, merge: bool, mirror: Optional[WheelMirror]):
+    for name, document_path in client.fetch_many_to_cache(names).items():
+        existing_sources = load_existing_sources(name, location) if merge else {}
+
+        # Filter the releases before any of their wheels gets processed
+        if stream:
+            selected = select_releases(iter_release_versions_streaming(document_path), specifier, latest, pre,
+                                       existing_sources)
+            releases = iter_releases_streaming(document_path, selected)
+        else:
+            all_releases = load_releases(document_path)
+            selected = select_releases(all_releases.keys(), specifier, latest, pre, existing_sources)
+            releases = ((release, all_releases[release]) for release in sorted(selected))
+
+        print(f"{name}: processing {len(selected)} releases, keeping {len(existing_sources)} existing releases")
+        entries = itertools.chain(existing_sources.items(), iter_conandata(releases))
+        if mirror is not None:
+            # The existing releases are mirrored as well, the wheels that are already in the store aren't downloaded
+            entries = mirror.mirror_conandata(entries)
+        write_conandata(name, location, entries)
 
 
 if __name__ == '__main__':
     kwargs = docopt(__doc__, version = '0.1.0')
-    main(name = kwargs["<name>"], location = kwargs["<location>"])
+    pypi_client = PyPIClient(index_url = kwargs["--index-url"], cache_dir = kwargs["--cache"], jobs = int(kwargs["--jobs"]))
+    wheel_mirror = None
+    if kwargs["--mirror"]:
+        wheel_mirror = WheelMirror(store = Path(kwargs["--mirror"]), base_url = kwargs["--mirror-url"],
+                                   session = pypi_client.session, jobs = int(kwargs["--jobs"]))
+    main(names = kwargs["<name>"],
+         location = kwargs["<location>"],
+         client = pypi_client,
+         stream = kwargs["--stream"],
+         specifier = SpecifierSet(kwargs["--versions"]) if kwargs["--versions"] else None,
+         latest = int(kwargs["--latest"]) if kwargs["--latest"] else None,
+         pre = kwargs["--pre"],
+         merge = kwargs["--merge"],
+         mirror = wheel_mirror)
@@ -1,55 +1,124 @@
 """Usage:
-  create_pypi_recipe.py <name> <version> <location>
+  create_pypi_recipe.py batch [options] <manifest> <location>
+  create_pypi_recipe.py [options] <name> <version> <location>
   create_pypi_recipe.py -h | --help | --version
+
+The batch command generates a recipe in <location>/<name>/conanfile.py for every package in the manifest, a YAML
+mapping of package names to versions.
+
+Options:
+  --closure                 Also generate recipes for the transitive requirements (requires_dist) of the packages,
+                            using their latest release that satisfies the requirements on them. The recipes are
+                            listed in dependency order in <location>/export_order.yml
+  --python=<version>        Python version the environment markers of the requirements are evaluated for, on all
+                            target platforms [default: 3.12]
+  -j <jobs>, --jobs=<jobs>  Number of concurrent requests to the package index [default: 8]
+  --index-url=<url>         Base URL of the PyPI JSON API [default: https://pypi.org/pypi]
+  --cache=<dir>             Directory caching the index responses (defaults to .pypi_cache in the root of the index)
 """
-import requests
+import re
+import yaml
 
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List
 
 from jinja2 import Template
 from docopt import docopt
 
-def main(name: str, version: str, location: str):
-    resp = requests.get(f"https://pypi.org/pypi/{name}/json").json()
-    jinja_template_path = Path(__file__).resolve().parent.joinpath("pypi.jinja")
+from pypi_client import PyPIClient
+from requirements_graph import RequirementGraph, latest_matching_release
 
-    if resp["info"]["requires_dist"] is not None:
-        requirements = ",\\\n                "
-        for requirement in resp["info"]["requires_dist"]:
-            req = requirement.split(";")  # TODO: take options into account
-            r = req[0].split(" (")
-            if len(r) == 2:
-                v = "[" + r[1][:-1].replace(" ", "").replace(",", " ") + "]"
-            else:
-                v = "[>=0.0.0]"
-            requirements += f"\"{r[0].replace(' ', '')}/{v}@lulzbot/testing\",\n                "
-        if len(requirements) > 19:
-            requirements = requirements[:-19]
-    else:
-        requirements = ""
 
-    result = ""
+@lru_cache(maxsize = None)
+def load_template() -> Template:
+    """ Reads and compiles the recipe template, once per run """
+    jinja_template_path = Path(__file__).resolve().parent.joinpath("pypi.jinja")
     with open(jinja_template_path, "r") as f:
-        tm = Template(f.read())
-        result = tm.render(name = name,
-                           package_name = name.capitalize(),
-                           version = version,
-                           description = resp["info"].get("summary", ""),
-                           license = resp["info"].get("license", ""),
-                           homepage = resp["info"].get("home_page", ""),
-                           url = resp["info"].get("project_urls", {}).get("Homepage", ""),
-                           requirements = requirements.lower(),
-                           )
-        result_path = Path(location)
-        result_path.mkdir(exist_ok = True)
-        conanfile_path = result_path.joinpath("conanfile.py")
-        conanfile_path.unlink(missing_ok = True)
-        print(f"Writing conanfile to: {conanfile_path}")
+        return Template(f.read())
+
+
+def render_recipe(name: str, version: str, info: dict, requirements: List[str], os_requirements: Dict[str, List[str]]) -> str:
+    return load_template().render(name = name,
+                                  package_name = "".join(part.capitalize() for part in re.split(r"[-_.]+", name)),
+                                  version = version,
+                                  description = info.get("summary", ""),
+                                  license = info.get("license", ""),
+                                  homepage = info.get("home_page", ""),
+                                  url = (info.get("project_urls") or {}).get("Homepage", ""),
+                                  requirements = requirements,
+                                  os_requirements = os_requirements,
+                                  )
+
+
+def write_recipe(conanfile_path: Path, content: str) -> None:
+    conanfile_path.parent.mkdir(parents = True, exist_ok = True)
+    conanfile_path.unlink(missing_ok = True)
+    print(f"Writing conanfile to: {conanfile_path}")
     with open(conanfile_path, "w") as f:
-        f.write(result)
+        f.write(content)
+
+
+def resolve_closure(packages: Dict[str, str], client: PyPIClient, graph: RequirementGraph) -> None:
+    """ Adds the packages and, level by level, all their transitive requirements to the graph """
+    pending = list(packages.items())
+    while pending:
+        requirements = [graph.add(name, version, resp["info"])
+                        for (name, version), resp in client.fetch_many_releases(pending).items()]
+        new_names = sorted({name for package_requirements in requirements for name in package_requirements
+                            if name not in graph})
+
+        # Requirements are generated for their latest release that satisfies every requirement on them seen so far
+        pending = []
+        for name, resp in client.fetch_many(new_names).items():
+            version = latest_matching_release(resp["releases"].keys(), graph.constraint(name))
+            if version is None:
+                print(f"No release of {name} matches {graph.constraint(name)}, using its latest release")
+                version = resp["info"]["version"]
+            pending.append((name, version))
+
+
+def batch(packages: Dict[str, str], location: str, client: PyPIClient, closure: bool, python_version: str):
+    graph = RequirementGraph(python_version)
+    if closure:
+        resolve_closure(packages, client, graph)
+    else:
+        for (name, version), resp in client.fetch_many_releases(packages.items()).items():
+            graph.add(name, version, resp["info"])
+
+    export_order = []
+    for name, version, info in graph.topological_order():
+        write_recipe(Path(location, name, "conanfile.py"), render_recipe(name, version, info, graph.requirements(name),
+                                                                         graph.os_requirements(name)))
+        export_order.append({"name": name, "version": version})
+
+    export_order_path = Path(location, "export_order.yml")
+    print(f"Writing the export order to: {export_order_path}")
+    with open(export_order_path, "w") as f:
+        yaml.safe_dump(export_order, f, sort_keys = False)
+
+
+def main(name: str, version: str, location: str, client: PyPIClient, python_version: str):
+    resp = client.fetch(name, version)
+    graph = RequirementGraph(python_version)
+    graph.add(name, version, resp["info"])
+    result_path = Path(location)
+    result_path.mkdir(exist_ok = True)
+    write_recipe(result_path.joinpath("conanfile.py"), render_recipe(name, version, resp["info"], graph.requirements(name),
+                                                                     graph.os_requirements(name)))
+
+
+def load_manifest(manifest_path: str) -> Dict[str, str]:
+    with open(manifest_path, "r") as f:
+        return {str(name): str(version) for name, version in (yaml.safe_load(f) or {}).items()}
+
 
 if __name__ == '__main__':
     kwargs = docopt(__doc__, version='0.1.0')
-    main(name = kwargs["<name>"], version = kwargs["<version>"], location = kwargs["<location>"])
-
-# TODO: Handle hashes
+    pypi_client = PyPIClient(index_url = kwargs["--index-url"], cache_dir = kwargs["--cache"], jobs = int(kwargs["--jobs"]))
+    if kwargs["batch"]:
+        batch(packages = load_manifest(kwargs["<manifest>"]), location = kwargs["<location>"], client = pypi_client,
+              closure = kwargs["--closure"], python_version = kwargs["--python"])
+    else:
+        main(name = kwargs["<name>"], version = kwargs["<version>"], location = kwargs["<location>"], client = pypi_client,
+             python_version = kwargs["--python"])
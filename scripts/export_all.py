@@ -1,15 +1,202 @@
-import sys
-import yaml
+"""Usage:
+  export_all.py [options] [<user> <channel>]
+  export_all.py -h | --help | --version
+
+Every recipe version listed in a recipe's config.yml is exported from the folder it maps to, using the user and
+channel of that config.yml. The <user> and <channel> arguments are used for recipes that don't specify them.
+A recipe version is only skipped when its inputs did not change since it was exported into the current Conan cache,
+and the recipe is still in that cache.
+
+Options:
+  --engine=<engine>         Export engine: "api" exports everything in-process through a single Conan API instance,
+                            "cli" spawns one `conan export` process per recipe version [default: api]
+  -j <jobs>, --jobs=<jobs>  Number of `conan export` processes to run concurrently with the cli engine [default: 1]
+  --state=<file>            State file holding the input hashes of the last successful exports per Conan cache
+                            (defaults to .export_state.json in the root of the index)
+  --force                   Export every recipe version, even when its inputs did not change
+"""
+import hashlib
+import json
 import subprocess
+import time
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+
+import yaml
+from docopt import docopt
+
+INDEX_ROOT = Path(__file__).absolute().parents[1]
+
+
+@dataclass(frozen = True)
+class RecipeExport:
+    name: str
+    version: str
+    user: Optional[str]
+    channel: Optional[str]
+    export_path: Path
+    inputs_hash: str
+
+    @property
+    def reference(self) -> str:
+        if self.user is None or self.channel is None:
+            return f"{self.name}/{self.version}"
+        return f"{self.name}/{self.version}@{self.user}/{self.channel}"
+
+
+def recipe_inputs_hash(export_path: Path) -> str:
+    """ Hashes everything `conan export` picks up from a recipe folder: conanfile.py, conandata.yml, patches and
+    exported sources. The test packages are not exported, so they are left out. """
+    digest = hashlib.sha256()
+    for path in sorted(export_path.rglob("*")):
+        relative_path = path.relative_to(export_path)
+        if not path.is_file() or relative_path.parts[0].startswith("test_") or "__pycache__" in relative_path.parts:
+            continue
+        digest.update(relative_path.as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def collect_exports(user: Optional[str], channel: Optional[str]):
+    """ Yields a RecipeExport for every version in the config.yml of every recipe in the index """
+    inputs_hashes = {}
+    for config_path in sorted(INDEX_ROOT.joinpath("recipes").glob("*/config.yml")):
+        recipe_name = config_path.parent.name
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+
+        recipe_user = config.get("user", user)
+        recipe_channel = config.get("channel", channel)
+        for recipe_version, version_config in config["versions"].items():
+            export_path = config_path.parent.joinpath(version_config["folder"])
+            if export_path not in inputs_hashes:
+                inputs_hashes[export_path] = recipe_inputs_hash(export_path)
+            yield RecipeExport(recipe_name, str(recipe_version), recipe_user, recipe_channel, export_path,
+                               inputs_hashes[export_path])
+
+
+def load_state(state_path: Path) -> dict:
+    """ The input hashes of the exported recipe versions, by Conan cache folder """
+    if not state_path.exists():
+        return {}
+    with open(state_path, "r") as f:
+        state = json.load(f)
+    # State files that aren't keyed by cache folder can't tell which cache the recipes were exported into
+    return {cache_folder: exports for cache_folder, exports in state.items() if isinstance(exports, dict)}
+
+
+def save_state(state_path: Path, state: dict) -> None:
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent = 2, sort_keys = True)
+
+
+def export_cli(recipe: RecipeExport) -> bool:
+    cmd = ["conan", "export", str(recipe.export_path), "--name", recipe.name, "--version", recipe.version]
+    if recipe.user is not None and recipe.channel is not None:
+        cmd += ["--user", recipe.user, "--channel", recipe.channel]
+    return subprocess.run(cmd).returncode == 0
+
+
+def in_cache(conan_api, reference: str) -> bool:
+    """ Whether a revision of the recipe is in the Conan cache """
+    from conan.errors import ConanException
+    try:
+        from conan.api.model import RecipeReference
+    except ImportError:
+        from conans.model.recipe_ref import RecipeReference
+
+    try:
+        return conan_api.list.latest_recipe_revision(RecipeReference.loads(reference)) is not None
+    except ConanException:
+        return False
+
+
+class ApiExporter:
+    """ Exports recipes in-process, paying the Conan startup and remotes lookup only once for the whole index """
+
+    def __init__(self, conan_api):
+        self._conan_api = conan_api
+        self._remotes = self._conan_api.remotes.list()
+
+    def __call__(self, recipe: RecipeExport) -> bool:
+        from conan.errors import ConanException
+
+        try:
+            ref, _ = self._conan_api.export.export(path = str(recipe.export_path.joinpath("conanfile.py")),
+                                                   name = recipe.name,
+                                                   version = recipe.version,
+                                                   user = recipe.user,
+                                                   channel = recipe.channel,
+                                                   lockfile = None,
+                                                   remotes = self._remotes)
+        except ConanException as e:
+            print(f"ERROR: {recipe.reference}: {e}")
+            return False
+        print(f"Exported {ref.repr_notime()}")
+        return True
+
+
+def timed(export_function):
+    def run(recipe: RecipeExport):
+        start = time.perf_counter()
+        succeeded = export_function(recipe)
+        return succeeded, time.perf_counter() - start
+    return run
+
+
+def main(user: Optional[str], channel: Optional[str], engine: str, jobs: int, state_path: Path, force: bool):
+    from conan.api.conan_api import ConanAPI
+
+    conan_api = ConanAPI()
+    state = load_state(state_path)
+    exported = state.setdefault(conan_api.cache_folder, {})
+    pending = []
+    for recipe in collect_exports(user, channel):
+        if not force and exported.get(recipe.reference) == recipe.inputs_hash and in_cache(conan_api, recipe.reference):
+            print(f"Skipping {recipe.reference}, its inputs did not change since the last export")
+            continue
+        pending.append(recipe)
+
+    if engine == "api":
+        # The Conan API isn't thread-safe, all exports go through the single instance one after the other
+        export = timed(ApiExporter(conan_api))
+        results = [export(recipe) for recipe in pending]
+    elif engine == "cli":
+        with ThreadPoolExecutor(max_workers = jobs) as executor:
+            results = list(executor.map(timed(export_cli), pending))
+    else:
+        raise ValueError(f"Unknown export engine: {engine}")
+
+    failed = []
+    timings = defaultdict(float)
+    for recipe, (succeeded, duration) in zip(pending, results):
+        timings[recipe.name] += duration
+        if succeeded:
+            exported[recipe.reference] = recipe.inputs_hash
+        else:
+            failed.append(recipe.reference)
+    save_state(state_path, state)
+
+    print(f"Exported {len(pending) - len(failed)} recipe versions, {len(failed)} failed")
+    for recipe_name, duration in sorted(timings.items(), key = lambda item: item[1], reverse = True):
+        print(f"  {recipe_name:<30} {duration:8.2f}s")
+    for reference in failed:
+        print(f"Failed to export: {reference}")
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    recipes_paths = Path(__file__).absolute().parents[1].joinpath("recipes").glob("**/conandata.yml")
-    for recipe_path in recipes_paths:
-        recipe_name = recipe_path.parts[-3]
-        export_path = recipe_path.parent
-        with open(recipe_path, "r") as f:
-            parsed_yaml = yaml.safe_load(f)
-            for recipe_version in parsed_yaml["sources"].keys():
-                subprocess.run(f"conan export {export_path} {recipe_name}/{recipe_version}@{sys.argv[1]}/{sys.argv[2]}", shell = True)
+    kwargs = docopt(__doc__, version = '0.1.0')
+    state_file = Path(kwargs["--state"]) if kwargs["--state"] else INDEX_ROOT.joinpath(".export_state.json")
+    raise SystemExit(main(user = kwargs["<user>"],
+                          channel = kwargs["<channel>"],
+                          engine = kwargs["--engine"],
+                          jobs = max(1, int(kwargs["--jobs"])),
+                          state_path = state_file,
+                          force = kwargs["--force"]))
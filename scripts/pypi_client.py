@@ -0,0 +1,119 @@
+import json
+import os
+import re
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PYPI_INDEX_URL = "https://pypi.org/pypi"
+DEFAULT_CACHE_DIR = Path(__file__).absolute().parents[1].joinpath(".pypi_cache")
+CHUNK_SIZE = 1024 * 1024
+
+
+def normalize_name(name: str) -> str:
+    """ PEP 503 normalized project name """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class PyPIClient:
+    """
+    Fetches project metadata from the PyPI JSON API
+
+    Responses are stored in an on-disk cache together with their ETag and Last-Modified headers, re-fetching a project
+    only downloads it again when PyPI reports that it changed. A single pooled session is shared by all the requests,
+    so batches of projects can be fetched concurrently with `fetch_many`.
+
+    The index_url can point to any server that serves the PyPI JSON layout (`<index_url>/<name>/json`), such as a
+    local stand-in server.
+    """
+
+    def __init__(self, index_url: str = PYPI_INDEX_URL, cache_dir: Optional[Path] = None, jobs: int = 8):
+        self._index_url = index_url.rstrip("/")
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self._cache_dir.mkdir(parents = True, exist_ok = True)
+        self._jobs = max(1, jobs)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections = self._jobs, pool_maxsize = self._jobs)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    def _url(self, name: str, version: Optional[str]) -> str:
+        if version is None:
+            return f"{self._index_url}/{name}/json"
+        return f"{self._index_url}/{name}/{version}/json"
+
+    def _cache_path(self, name: str, version: Optional[str]) -> Path:
+        stem = normalize_name(name) if version is None else f"{normalize_name(name)}-{version}"
+        return self._cache_dir.joinpath(f"{stem}.json")
+
+    def fetch_to_cache(self, name: str, version: Optional[str] = None) -> Path:
+        """ Makes sure the cache holds the latest metadata of the project and returns the path of the cached document """
+        body_path = self._cache_path(name, version)
+        meta_path = body_path.with_suffix(".meta")
+
+        headers = {}
+        if body_path.exists() and meta_path.exists():
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self._session.get(self._url(name, version), headers = headers, stream = True) as resp:
+            if resp.status_code == 304:
+                return body_path
+            resp.raise_for_status()
+
+            # Stream the body to disk, big projects have documents of tens of MB
+            fd, tmp_path = tempfile.mkstemp(dir = self._cache_dir, suffix = ".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size = CHUNK_SIZE):
+                        f.write(chunk)
+                os.replace(tmp_path, body_path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok = True)
+                raise
+
+            with open(meta_path, "w") as f:
+                json.dump({"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}, f)
+        return body_path
+
+    def fetch(self, name: str, version: Optional[str] = None) -> dict:
+        """ Returns the PyPI JSON document of the project, or of a specific release of it """
+        with open(self.fetch_to_cache(name, version), "rb") as f:
+            return json.load(f)
+
+    def _map_unique(self, function, keys: Iterable, normalized_key) -> dict:
+        """ Runs the function concurrently once per normalized key, e.g. PyQt6 and pyqt6 share their cache files, and
+        returns the result for every requested key """
+        unique = {}
+        for key in keys:
+            unique.setdefault(normalized_key(key), []).append(key)
+        with ThreadPoolExecutor(max_workers = self._jobs) as executor:
+            results = executor.map(lambda spellings: function(spellings[0]), unique.values())
+            return {key: result for spellings, result in zip(unique.values(), results) for key in dict.fromkeys(spellings)}
+
+    def fetch_many(self, names: Iterable[str]) -> Dict[str, dict]:
+        """ Fetches the metadata of multiple projects concurrently """
+        return self._map_unique(self.fetch, names, normalize_name)
+
+    def fetch_many_releases(self, releases: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], dict]:
+        """ Fetches the metadata of multiple (name, version) releases concurrently """
+        return self._map_unique(lambda release: self.fetch(*release), releases,
+                                lambda release: (normalize_name(release[0]), release[1]))
+
+    def fetch_many_to_cache(self, names: Iterable[str]) -> Dict[str, Path]:
+        """ Fetches the metadata of multiple projects concurrently, returning the paths of the cached documents instead
+        of loading them all in memory """
+        return self._map_unique(self.fetch_to_cache, names, normalize_name)
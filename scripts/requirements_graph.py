@@ -0,0 +1,187 @@
+import re
+
+from graphlib import CycleError, TopologicalSorter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from packaging.markers import Marker
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import Specifier, SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+# The (platform.system(), platform.machine(), sys.platform, os.name) of the platforms we build for
+TARGET_PLATFORMS = (
+    ("Linux", "x86_64", "linux", "posix"),
+    ("Windows", "AMD64", "win32", "nt"),
+    ("Darwin", "x86_64", "darwin", "posix"),
+    ("Darwin", "arm64", "darwin", "posix"),
+)
+
+# Conan settings.os of the platform.system() values
+CONAN_OS = {"Linux": "Linux", "Windows": "Windows", "Darwin": "Macos"}
+TARGET_OS = frozenset(CONAN_OS[system] for system, _, _, _ in TARGET_PLATFORMS)
+
+CONAN_USER_CHANNEL = "lulzbot/testing"
+
+
+class Edge(NamedTuple):
+    """ A requirement on a package: the merged specifier for every Conan operating system that needs it """
+    specifiers: Dict[str, SpecifierSet]
+
+    @property
+    def target_os(self) -> FrozenSet[str]:
+        return frozenset(self.specifiers)
+
+    @property
+    def is_uniform(self) -> bool:
+        """ Whether all target operating systems need the package, with the same specifier """
+        return self.target_os == TARGET_OS and len({str(specifier) for specifier in self.specifiers.values()}) == 1
+
+
+def target_environments(python_version: str) -> List[Dict[str, str]]:
+    """ PEP 508 marker environments of all our target platforms for a CPython version """
+    version = Version(python_version)
+    return [{
+        "implementation_name": "cpython",
+        "implementation_version": f"{version.major}.{version.minor}.0",
+        "os_name": os_name,
+        "platform_machine": machine,
+        "platform_python_implementation": "CPython",
+        "platform_release": "",
+        "platform_system": system,
+        "platform_version": "",
+        "python_full_version": f"{version.major}.{version.minor}.0",
+        "python_version": f"{version.major}.{version.minor}",
+        "sys_platform": sys_platform,
+    } for system, machine, sys_platform, os_name in TARGET_PLATFORMS]
+
+
+def _marker_os(marker: Optional[Marker], environments: List[Dict[str, str]]) -> FrozenSet[str]:
+    """ The Conan operating systems of the environments the marker applies to, requirements behind an extra are never
+    installed """
+    return frozenset(CONAN_OS[environment["platform_system"]] for environment in environments
+                     if marker is None or marker.evaluate(dict(environment, extra = "")))
+
+
+def parse_requirements(requires_dist: Optional[Iterable[str]], environments: List[Dict[str, str]]) -> Dict[str, Edge]:
+    """ Parses PEP 508 requirements and keeps the ones applicable to any of the environments. The specifiers of
+    requirements that are listed multiple times, e.g. with different markers, are only merged for the operating systems
+    they both apply to. """
+    requirements: Dict[str, Edge] = {}
+    for requirement_str in requires_dist or []:
+        try:
+            requirement = Requirement(requirement_str)
+        except InvalidRequirement:
+            print(f"Ignoring invalid requirement: {requirement_str}")
+            continue
+        target_os = _marker_os(requirement.marker, environments)
+        if not target_os:
+            continue
+        name = canonicalize_name(requirement.name)
+        specifiers = requirements.setdefault(name, Edge({})).specifiers
+        for os_name in target_os:
+            specifiers[os_name] = specifiers.get(os_name, SpecifierSet()) & requirement.specifier
+    return requirements
+
+
+def _upper_bound(release: Tuple[int, ...]) -> str:
+    """ The version above a prefix: 1.4 -> 1.5 """
+    return ".".join(map(str, release[:-1] + (release[-1] + 1,)))
+
+
+def _conan_clauses(specifier: Specifier) -> List[str]:
+    operator, version = specifier.operator, specifier.version
+    if operator in ("==", "===") and not version.endswith(".*"):
+        return [f">={version}", f"<={version}"]
+    if operator == "==":
+        prefix = tuple(int(part) for part in re.findall(r"\d+", version.removesuffix(".*")))
+        return [f">={'.'.join(map(str, prefix))}", f"<{_upper_bound(prefix)}"]
+    if operator == "~=":
+        release = Version(version).release
+        return [f">={version}", f"<{_upper_bound(release[:-1])}"]
+    if operator == "!=":
+        # Conan version ranges have no exclusions
+        return []
+    return [f"{operator}{version}"]
+
+
+def conan_requirement(name: str, specifier: SpecifierSet) -> str:
+    """ Conan reference of a Python requirement, with its PEP 440 specifier as a Conan version range """
+    clauses = [clause for spec in sorted(specifier, key = str) for clause in _conan_clauses(spec)]
+    if not clauses:
+        clauses = [">=0.0.0"]
+    return f"{name}/[{' '.join(clauses)}]@{CONAN_USER_CHANNEL}"
+
+
+def latest_matching_release(releases: Iterable[str], specifier: SpecifierSet) -> Optional[str]:
+    """ The most recent final release matching the specifier, pre-releases are only used when no final release matches """
+    versions = []
+    for release in releases:
+        try:
+            versions.append((Version(release), release))
+        except InvalidVersion:
+            continue
+    matching = [(version, release) for version, release in versions if specifier.contains(version, prereleases = True)]
+    final = [(version, release) for version, release in matching if not version.is_prerelease]
+    if final or matching:
+        return max(final or matching)[1]
+    return None
+
+
+class RequirementGraph:
+    """
+    Graph of Python packages and their requirements
+
+    Every node is a package at a single version, the edges carry the merged specifier of the requirement and the
+    operating systems that need it. The nodes are emitted in dependency order, so the recipes can be exported one after
+    the other.
+    """
+
+    def __init__(self, python_version: str):
+        self._environments = target_environments(python_version)
+        self._nodes: Dict[str, Tuple[str, str, dict]] = {}
+        self._edges: Dict[str, Dict[str, Edge]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self._nodes
+
+    def add(self, name: str, version: str, info: dict) -> Dict[str, Edge]:
+        """ Adds a package to the graph, returns its parsed requirements """
+        key = canonicalize_name(name)
+        self._nodes[key] = (name, version, info)
+        self._edges[key] = parse_requirements(info.get("requires_dist"), self._environments)
+        return self._edges[key]
+
+    def constraint(self, name: str) -> SpecifierSet:
+        """ The combined specifier of all the requirements on a package in the graph, on all operating systems as a
+        single release of every package is generated """
+        key = canonicalize_name(name)
+        specifier = SpecifierSet()
+        for requirements in self._edges.values():
+            if key in requirements:
+                for os_specifier in requirements[key].specifiers.values():
+                    specifier &= os_specifier
+        return specifier
+
+    def requirements(self, name: str) -> List[str]:
+        """ The Conan requirements of a package that apply to all target operating systems alike """
+        return [conan_requirement(requirement, next(iter(edge.specifiers.values())))
+                for requirement, edge in sorted(self._edges[canonicalize_name(name)].items()) if edge.is_uniform]
+
+    def os_requirements(self, name: str) -> Dict[str, List[str]]:
+        """ The Conan requirements of a package that only apply to some target operating systems, or with a different
+        specifier per operating system, by Conan os """
+        requirements: Dict[str, List[str]] = {}
+        for requirement, edge in sorted(self._edges[canonicalize_name(name)].items()):
+            if not edge.is_uniform:
+                for os_name, specifier in sorted(edge.specifiers.items()):
+                    requirements.setdefault(os_name, []).append(conan_requirement(requirement, specifier))
+        return dict(sorted(requirements.items()))
+
+    def topological_order(self) -> List[Tuple[str, str, dict]]:
+        """ The packages ordered so that every package comes after its requirements """
+        sorter = TopologicalSorter({key: [dep for dep in deps if dep in self._nodes] for key, deps in self._edges.items()})
+        try:
+            return [self._nodes[key] for key in sorter.static_order()]
+        except CycleError as e:
+            raise ValueError(f"Requirement cycle between: {', '.join(e.args[1])}") from e
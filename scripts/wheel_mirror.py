@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class WheelMirror:
+    """
+    Content-addressed local store of the wheels referenced by a conandata.yml
+
+    Wheels are stored as `sha256/<first two hex digits>/<sha256>/<filename>` and are verified against their digest
+    while they are streamed to disk, a wheel only ends up in the store once its digest matched. The mirrored sources
+    point to the same layout below base_url, so the store can be served as-is to builders without access to pypi.org.
+    """
+
+    def __init__(self, store: Path, base_url: Optional[str] = None, session: Optional[requests.Session] = None,
+                 jobs: int = 8):
+        self._store = Path(store).absolute()
+        self._store.mkdir(parents = True, exist_ok = True)
+        self._base_url = (base_url or self._store.as_uri()).rstrip("/")
+        self._session = session or requests.Session()
+        self._jobs = max(1, jobs)
+
+    @staticmethod
+    def _relative_path(sha256: str, filename: str) -> str:
+        return f"sha256/{sha256[:2]}/{sha256}/{filename}"
+
+    def store_path(self, sha256: str, filename: str) -> Path:
+        return self._store.joinpath(self._relative_path(sha256, filename))
+
+    def url(self, sha256: str, filename: str) -> str:
+        return f"{self._base_url}/{self._relative_path(sha256, filename)}"
+
+    def download(self, url: str, sha256: str) -> Path:
+        """ Downloads the wheel into the store, unless it is already there, and returns its path """
+        filename = unquote(Path(urlparse(url).path).name)
+        path = self.store_path(sha256, filename)
+        if path.exists():
+            return path
+
+        path.parent.mkdir(parents = True, exist_ok = True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir = path.parent, suffix = ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, self._session.get(url, stream = True) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_content(chunk_size = CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+            if digest.hexdigest() != sha256:
+                raise ValueError(f"sha256 mismatch for {url}: expected {sha256}, got {digest.hexdigest()}")
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok = True)
+            raise
+        return path
+
+    def _mirror_source(self, source: dict) -> Tuple[dict, Optional[str]]:
+        try:
+            path = self.download(source["url"], source["sha256"])
+        except Exception as e:
+            return source, str(e)
+        return {"url": self.url(source["sha256"], path.name), "sha256": source["sha256"]}, None
+
+    def mirror_conandata(self, entries: Iterable[Tuple[str, dict]]) -> List[Tuple[str, dict]]:
+        """ Downloads the wheels of all conandata entries concurrently, and returns the entries pointing to the
+        mirror. Raises when any of the wheels could not be downloaded or verified. """
+        entries = list(entries)
+        sources = [(release, os_name, python_version, source)
+                   for release, entry in entries
+                   for os_name, by_python_version in entry.items()
+                   for python_version, source in by_python_version.items()]
+
+        with ThreadPoolExecutor(max_workers = self._jobs) as executor:
+            results = list(executor.map(lambda item: self._mirror_source(item[3]), sources))
+
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            raise RuntimeError("Unable to mirror all wheels:\n" + "\n".join(errors))
+
+        mirrored: Dict[str, dict] = {release: {} for release, _ in entries}
+        for (release, os_name, python_version, _), (source, _) in zip(sources, results):
+            mirrored[release].setdefault(os_name, {})[python_version] = source
+        return list(mirrored.items())
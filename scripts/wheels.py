@@ -0,0 +1,124 @@
+import re
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# manylinux1_x86_64, manylinux2014_x86_64, manylinux_2_17_x86_64, musllinux_1_1_x86_64, macosx_10_9_x86_64 and
+# win_amd64
+PLATFORM_TAG_RE = re.compile(r"^(?P<platform>manylinux|musllinux|macosx|win)(?:\d+|_\d+_\d+)?_(?P<arch>\w+)$")
+
+# Platform tags without an architecture suffix
+FIXED_PLATFORM_TAGS = {"any": ("Any", "any"), "win32": ("Windows", "x86")}
+
+# Conan operating system names for the platform tags we build for, and the architectures we select for each of
+# them, in order of preference. musllinux wheels don't run on the glibc based Linux we build for.
+PLATFORM_OS = {"manylinux": "Linux", "macosx": "Darwin", "win": "Windows"}
+PREFERRED_ARCHS = {
+    "Any": ("any",),
+    "Linux": ("x86_64",),
+    "Darwin": ("x86_64", "intel", "universal2"),
+    "Windows": ("amd64",),
+}
+
+
+class WheelTags(NamedTuple):
+    name: str
+    version: str
+    build: Optional[str]
+    python_tags: Tuple[str, ...]
+    abi_tags: Tuple[str, ...]
+    platform_tags: Tuple[str, ...]
+
+
+def parse_wheel_filename(filename: str) -> WheelTags:
+    """ Splits a wheel filename into its PEP 427 fields, expanding the PEP 425 compressed tag sets """
+    parts = filename.removesuffix(".whl").split("-")
+    if len(parts) == 5:
+        name, version, python_tag, abi_tag, platform_tag = parts
+        build = None
+    elif len(parts) == 6:
+        name, version, build, python_tag, abi_tag, platform_tag = parts
+    else:
+        raise ValueError(f"Invalid wheel filename: {filename}")
+    return WheelTags(name, version, build, tuple(python_tag.split(".")), tuple(abi_tag.split(".")),
+                     tuple(platform_tag.split(".")))
+
+
+def python_version(python_tag: str) -> Optional[str]:
+    """ Returns the Python version of a CPython or generic Python tag (cp310 -> 3.10, py3 -> 3.0), None otherwise """
+    if python_tag[:2] not in ("cp", "py") or not python_tag[2:].isdigit():
+        return None
+    digits = python_tag[2:]
+    if len(digits) > 1:
+        return f"{digits[0]}.{digits[1:]}"
+    return f"{digits}.0"
+
+
+def is_cpython_compatible_abi(abi_tag: str) -> bool:
+    """ Whether the ABI is usable by the default CPython build, the free-threaded ABIs (cp313t) are not """
+    return abi_tag in ("none", "abi3") or (abi_tag.startswith("cp") and not abi_tag.endswith("t"))
+
+
+def platform_os_arch(platform_tag: str) -> Optional[Tuple[str, str]]:
+    """ Returns the (os, arch) of a platform tag, e.g. macosx_10_9_x86_64 -> (Darwin, x86_64), None for the platforms
+    we don't build for """
+    if platform_tag in FIXED_PLATFORM_TAGS:
+        return FIXED_PLATFORM_TAGS[platform_tag]
+    match = PLATFORM_TAG_RE.match(platform_tag)
+    if match is None or match.group("platform") not in PLATFORM_OS:
+        return None
+    return PLATFORM_OS[match.group("platform")], match.group("arch")
+
+
+class WheelIndex:
+    """
+    Index of the wheels of a project keyed by (release, os, python version, arch)
+
+    The index is built in a single pass over the release files, the conandata sources are then selected from it
+    using the preferred architecture of each operating system.
+    """
+
+    __slots__ = ("_wheels",)
+
+    def __init__(self):
+        self._wheels: Dict[Tuple[str, str, str, str], Tuple[str, str]] = {}
+
+    def __len__(self):
+        return len(self._wheels)
+
+    def add(self, release: str, filename: str, url: str, sha256: str) -> None:
+        tags = parse_wheel_filename(filename)
+        if not any(is_cpython_compatible_abi(abi_tag) for abi_tag in tags.abi_tags):
+            return
+
+        versions = [version for version in map(python_version, tags.python_tags) if version is not None]
+        if not versions:
+            return
+        # A compressed tag set such as py2.py3 is registered under the most recent Python version
+        version = max(versions, key = lambda v: tuple(int(part) for part in v.split(".")))
+
+        for platform_tag in tags.platform_tags:
+            os_arch = platform_os_arch(platform_tag)
+            if os_arch is not None:
+                self._wheels[(release, os_arch[0], version, os_arch[1])] = (url, sha256)
+
+    def add_release_files(self, release: str, release_files) -> None:
+        for data in release_files:
+            if data["packagetype"] == "bdist_wheel":
+                self.add(release, data["filename"], data["url"], str(data["digests"]["sha256"]))
+
+    def conandata(self) -> dict:
+        """ Returns the conandata sources: {release: {os: {python version: {url, sha256}}}} """
+        sources = {}
+        for (release, os_name, version, arch), (url, sha256) in self._wheels.items():
+            preferred_archs = PREFERRED_ARCHS[os_name]
+            if arch not in preferred_archs:
+                continue
+            by_python_version = sources.setdefault(release, {}).setdefault(os_name, {})
+            current = by_python_version.get(version)
+            if current is None or preferred_archs.index(arch) < current[0]:
+                by_python_version[version] = (preferred_archs.index(arch), url, sha256)
+
+        return {release: {os_name: {version: {"url": url, "sha256": sha256}
+                                    for version, (_, url, sha256) in by_python_version.items()}
+                          for os_name, by_python_version in by_os.items()}
+                for release, by_os in sources.items()}
@@ -0,0 +1,8 @@
+import sys
+
+from pathlib import Path
+
+INDEX_ROOT = Path(__file__).absolute().parents[1]
+
+# The scripts import each other by module name, like they do when they are run from the scripts folder
+sys.path.insert(0, str(INDEX_ROOT.joinpath("scripts")))
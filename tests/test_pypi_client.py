@@ -0,0 +1,85 @@
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from pypi_client import PyPIClient
+
+ETAG = "\"revision-1\""
+
+
+class _IndexHandler(BaseHTTPRequestHandler):
+    """ Serves `<name>/json` documents with an ETag, answering revalidations of that ETag with 304 Not Modified """
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        name = self.path.strip("/").split("/")[1]
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps({"info": {"name": name, "version": "1.0.0"}, "releases": {"1.0.0": []}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def index_server():
+    """ A local stand-in for the PyPI JSON API """
+    handler = type("Handler", (_IndexHandler,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/pypi", handler.requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fetch_revalidates_with_etag(tmp_path, index_server):
+    index_url, requests = index_server
+    client = PyPIClient(index_url = index_url, cache_dir = tmp_path, jobs = 2)
+
+    assert client.fetch("example")["info"]["name"] == "example"
+    assert requests == [("/pypi/example/json", None)]
+
+    # The cached document is revalidated with its ETag and served from the cache on 304 Not Modified
+    assert client.fetch("example")["info"]["name"] == "example"
+    assert requests[1] == ("/pypi/example/json", ETAG)
+    assert json.loads(tmp_path.joinpath("example.meta").read_text())["etag"] == ETAG
+
+
+def test_fetch_many_normalized_names(tmp_path, index_server):
+    index_url, requests = index_server
+    client = PyPIClient(index_url = index_url, cache_dir = tmp_path, jobs = 4)
+
+    documents = client.fetch_many(["PyQt6", "pyqt6", "PyQt6-sip", "pyqt6_sip"])
+
+    assert list(documents) == ["PyQt6", "pyqt6", "PyQt6-sip", "pyqt6_sip"]
+    assert documents["pyqt6"] == documents["PyQt6"]
+    assert sorted(path for path, _ in requests) == ["/pypi/PyQt6-sip/json", "/pypi/PyQt6/json"]
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == ["pyqt6-sip.json", "pyqt6.json"]
+
+
+def test_fetch_many_releases_normalized_names(tmp_path, index_server):
+    index_url, requests = index_server
+    client = PyPIClient(index_url = index_url, cache_dir = tmp_path, jobs = 4)
+
+    documents = client.fetch_many_releases([("PyQt6", "6.5.0"), ("pyqt6", "6.5.0"), ("PyQt6", "6.6.0")])
+
+    assert set(documents) == {("PyQt6", "6.5.0"), ("pyqt6", "6.5.0"), ("PyQt6", "6.6.0")}
+    assert sorted(path for path, _ in requests) == ["/pypi/PyQt6/6.5.0/json", "/pypi/PyQt6/6.6.0/json"]
@@ -0,0 +1,49 @@
+from requirements_graph import TARGET_OS, RequirementGraph, parse_requirements, target_environments
+
+
+def test_parse_requirements_target_os():
+    requirements = parse_requirements(['pywin32>=300; sys_platform == "win32"',
+                                       'appnope; sys_platform == "darwin"',
+                                       'uvloop; sys_platform != "win32"',
+                                       'requests>=2',
+                                       'pytest; extra == "test"',
+                                       'enum34; python_version < "3.4"'], target_environments("3.12"))
+
+    assert set(requirements) == {"pywin32", "appnope", "uvloop", "requests"}
+    assert requirements["pywin32"].target_os == {"Windows"}
+    assert requirements["appnope"].target_os == {"Macos"}
+    assert requirements["uvloop"].target_os == {"Linux", "Macos"}
+    assert requirements["requests"].target_os == TARGET_OS
+
+
+def test_parse_requirements_merges_markers():
+    requirements = parse_requirements(['colorama>=0.4; sys_platform == "win32"',
+                                       'colorama<1; sys_platform == "darwin" or sys_platform == "win32"'],
+                                      target_environments("3.12"))
+
+    assert requirements["colorama"].target_os == {"Windows", "Macos"}
+    assert str(requirements["colorama"].specifiers["Windows"]) == "<1,>=0.4"
+    assert str(requirements["colorama"].specifiers["Macos"]) == "<1"
+
+
+def test_os_specific_specifiers():
+    graph = RequirementGraph("3.12")
+    graph.add("example", "1.0", {"requires_dist": ['numpy>=2; sys_platform == "darwin"',
+                                                   'numpy<2; sys_platform == "win32"',
+                                                   'scipy>=1.10; sys_platform != "win32"',
+                                                   'scipy>=1.9; sys_platform == "win32"']})
+
+    assert graph.requirements("example") == []
+    assert graph.os_requirements("example") == {
+        "Linux": ["scipy/[>=1.10]@lulzbot/testing"],
+        "Macos": ["numpy/[>=2]@lulzbot/testing", "scipy/[>=1.10]@lulzbot/testing"],
+        "Windows": ["numpy/[<2]@lulzbot/testing", "scipy/[>=1.9]@lulzbot/testing"],
+    }
+
+
+def test_os_requirements():
+    graph = RequirementGraph("3.12")
+    graph.add("example", "1.0", {"requires_dist": ['pywin32>=300; sys_platform == "win32"', 'requests>=2']})
+
+    assert graph.requirements("example") == ["requests/[>=2]@lulzbot/testing"]
+    assert graph.os_requirements("example") == {"Windows": ["pywin32/[>=300]@lulzbot/testing"]}
@@ -0,0 +1,188 @@
+import gettext
+import importlib.util
+import json
+import sys
+import tempfile
+import uuid
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("conan")
+
+RECIPE_PATH = Path(__file__).absolute().parents[1].joinpath("recipes", "translationextractor", "all", "conanfile.py")
+
+
+def load_recipe_module():
+    """ Loads the recipe the way Conan does: under a generated module name that isn't registered in sys.modules """
+    spec = importlib.util.spec_from_file_location(str(uuid.uuid1()), RECIPE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Conf:
+    def __init__(self, values: dict):
+        self._values = values
+
+    def get(self, name, default = None, check_type = None):
+        return self._values.get(name, default)
+
+
+class _Output:
+    def __init__(self):
+        self.lines = []
+
+    def info(self, message):
+        self.lines.append(message)
+
+    warning = warn = info
+
+
+class _ConanFile:
+    """ The attributes of the consuming conanfile that ExtractTranslations uses """
+    name = "example"
+
+    def __init__(self, source_folder, build_folder, conf: dict, conan_data: dict):
+        self.source_folder = str(source_folder)
+        self.build_folder = str(build_folder)
+        self.conf = _Conf({"tools.build:jobs": 2, **conf})
+        self.conan_data = conan_data
+        self.output = _Output()
+
+    def run(self, command, **kwargs):
+        raise AssertionError(f"Unexpected command: {command}")
+
+
+@pytest.fixture
+def recipe_module():
+    return load_recipe_module()
+
+
+@pytest.fixture
+def tmp_folder():
+    """ A temporary folder outside of the pytest folders, the extraction skips all paths containing "test" """
+    with tempfile.TemporaryDirectory(prefix = "translationextractor-") as folder:
+        yield Path(folder)
+
+
+def _generate(recipe_module, source_folder, build_folder, conf: dict = None, conan_data: dict = None) -> _ConanFile:
+    conanfile = _ConanFile(source_folder, build_folder, conf or {}, conan_data or {})
+    recipe_module.ExtractTranslations(conanfile).generate()
+    assert recipe_module.__name__ not in sys.modules
+    return conanfile
+
+
+def test_native_backend(recipe_module, tmp_folder):
+    source_folder = tmp_folder.joinpath("src")
+    source_folder.joinpath("example").mkdir(parents = True)
+    source_folder.joinpath("example", "main.py").write_text(
+        "print(i18nc(\"@label\", \"Hello\"))\nprint(i18ncp(\"@label\", \"{0} file\", \"{0} files\", 2))\n", encoding = "utf-8")
+    source_folder.joinpath("example", "Main.qml").write_text(
+        "Text { text: catalog.i18nc(\"@title\", \"Welcome\") }\n", encoding = "utf-8")
+
+    _generate(recipe_module, source_folder, tmp_folder.joinpath("build"),
+              conf = {"user.translationextractor:backend": "native"},
+              conan_data = {"python_translation_source_folders": ["example"], "qml_translation_source_folders": ["example"]})
+
+    pot = recipe_module._Catalog.parse(source_folder.joinpath("resources", "i18n", "example.pot").read_text(encoding = "utf-8"))
+    assert set(pot.messages()) == {("@label", "Hello"), ("@label", "{0} file"), ("@title", "Welcome")}
+
+
+def test_nothing_to_extract(recipe_module, tmp_folder):
+    source_folder = tmp_folder.joinpath("src")
+    source_folder.mkdir()
+
+    _generate(recipe_module, source_folder, tmp_folder.joinpath("build"))
+
+    assert not source_folder.joinpath("resources", "i18n").exists()
+
+
+def test_settings_definitions(recipe_module, tmp_folder):
+    definitions = tmp_folder.joinpath("src", "resources", "definitions")
+    definitions.mkdir(parents = True)
+    definitions.joinpath("fdmprinter.def.json").write_text(json.dumps({
+        "metadata": {"variants_name": "Nozzle Size", "variants_name_has_translation": True},
+        "settings": {
+            "machine_settings": {
+                "label": "Machine",
+                "children": {
+                    "machine_shape": {"label": "Build Plate Shape", "description": "The shape of the build plate.",
+                                      "options": {"rectangular": "Rectangular", "elliptic": "Elliptic"}},
+                },
+            },
+        },
+    }), encoding = "utf-8")
+    definitions.joinpath("custom.def.json").write_text(json.dumps({
+        "inherits": "fdmprinter",
+        "metadata": {"variants_name": "Print Core", "variants_name_has_translation": True},
+        "overrides": {"machine_shape": {"default_value": "elliptic"}},
+    }), encoding = "utf-8")
+
+    # The second run serves the definitions from the extraction cache
+    for _ in range(2):
+        _generate(recipe_module, tmp_folder.joinpath("src"), tmp_folder.joinpath("build"))
+
+        pot_path = tmp_folder.joinpath("src", "resources", "i18n", "fdmprinter.def.json.pot")
+        pot = recipe_module._Catalog.parse(pot_path.read_text(encoding = "utf-8"))
+        assert set(pot.messages()) == {
+            ("machine_settings label", "Machine"),
+            ("machine_shape label", "Build Plate Shape"),
+            ("machine_shape description", "The shape of the build plate."),
+            ("machine_shape option rectangular", "Rectangular"),
+            ("machine_shape option elliptic", "Elliptic"),
+            ("variant_name", "Nozzle Size"),
+            ("variant_name", "Print Core"),
+        }
+        assert not tmp_folder.joinpath("src", "resources", "i18n", "custom.def.json.pot").exists()
+
+
+def test_compile_mo(recipe_module, tmp_folder):
+    po_path = tmp_folder.joinpath("src", "resources", "i18n", "de_DE", "example.po")
+    po_path.parent.mkdir(parents = True)
+    po_path.write_text("""msgid ""
+msgstr ""
+"Language: de_DE\\n"
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+
+msgctxt "@label"
+msgid "Hello"
+msgstr "Hallo"
+
+msgctxt "@label"
+msgid "{0} file"
+msgid_plural "{0} files"
+msgstr[0] "{0} Datei"
+msgstr[1] "{0} Dateien"
+
+#, fuzzy
+msgctxt "@label"
+msgid "Welcome"
+msgstr "Willkommen"
+""", encoding = "utf-8")
+
+    conf = {"user.translationextractor:compile_mo": True}
+    conanfile = _generate(recipe_module, tmp_folder.joinpath("src"), tmp_folder.joinpath("build"), conf = conf)
+    assert "Compiling 1 mo files..." in conanfile.output.lines
+
+    with open(tmp_folder.joinpath("build", "resources", "i18n", "de_DE", "LC_MESSAGES", "example.mo"), "rb") as f:
+        translations = gettext.GNUTranslations(f)
+    assert translations.pgettext("@label", "Hello") == "Hallo"
+    assert translations.npgettext("@label", "{0} file", "{0} files", 2) == "{0} Dateien"
+    assert translations.pgettext("@label", "Welcome") == "Welcome"
+
+    # Po files that didn't change aren't compiled again
+    conanfile = _generate(recipe_module, tmp_folder.joinpath("src"), tmp_folder.joinpath("build"), conf = conf)
+    assert not any(line.startswith("Compiling") for line in conanfile.output.lines)
+
+
+@pytest.mark.parametrize("source, messages", [
+    ("var r = /\"/; i18n(\"after regex\")", ["after regex"]),
+    ("validator: RegExpValidator { regExp: /^['\"]+\\/[a-z]*$/gi }\ntext: i18n(\"validated\")", ["validated"]),
+    ("function f() { return /[/\"]/.test(s) } i18n(\"returned\")", ["returned"]),
+    ("var x = (a) / b + \"/\"; i18n(\"division\")", ["division"]),
+])
+def test_javascript_regex_literals(recipe_module, source, messages):
+    assert [message[1] for message in recipe_module._extract_javascript_messages(source)] == messages
@@ -0,0 +1,131 @@
+import functools
+import hashlib
+import json
+import threading
+
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from wheel_mirror import WheelMirror
+
+WHEEL_NAME = "example-1.0.0-py3-none-any.whl"
+WHEEL_CONTENT = b"PK\x03\x04" + bytes(range(256)) * 4096  # spans several download chunks
+WHEEL_SHA256 = hashlib.sha256(WHEEL_CONTENT).hexdigest()
+
+
+class _CountingHandler(SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def index_server(tmp_path):
+    """ A local stand-in for files.pythonhosted.org serving a single wheel """
+    served = tmp_path.joinpath("served")
+    served.joinpath("packages").mkdir(parents = True)
+    served.joinpath("packages", WHEEL_NAME).write_bytes(WHEEL_CONTENT)
+
+    handler = type("Handler", (_CountingHandler,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory = str(served)))
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/packages/{WHEEL_NAME}", handler.requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _entries(url: str, sha256: str) -> list:
+    return [("1.0.0", {"Any": {"3.0": {"url": url, "sha256": sha256}}})]
+
+
+def _store_files(store) -> list:
+    return sorted(path.relative_to(store).as_posix() for path in store.rglob("*") if path.is_file())
+
+
+def test_mirror_verified_wheel(tmp_path, index_server):
+    url, _ = index_server
+    store = tmp_path.joinpath("store")
+    mirror = WheelMirror(store, base_url = "https://mirror.example/wheels/", jobs = 2)
+
+    mirrored = mirror.mirror_conandata(_entries(url, WHEEL_SHA256))
+
+    relative_path = f"sha256/{WHEEL_SHA256[:2]}/{WHEEL_SHA256}/{WHEEL_NAME}"
+    assert mirrored == [("1.0.0", {"Any": {"3.0": {"url": f"https://mirror.example/wheels/{relative_path}",
+                                                   "sha256": WHEEL_SHA256}}})]
+    assert _store_files(store) == [relative_path]
+    assert store.joinpath(relative_path).read_bytes() == WHEEL_CONTENT
+
+
+def test_mirror_rejects_digest_mismatch(tmp_path, index_server):
+    url, _ = index_server
+    store = tmp_path.joinpath("store")
+    mirror = WheelMirror(store, jobs = 2)
+    wrong_sha256 = hashlib.sha256(b"something else").hexdigest()
+
+    with pytest.raises(RuntimeError, match = "sha256 mismatch"):
+        mirror.mirror_conandata(_entries(url, wrong_sha256))
+    # Neither the wheel nor its partial download end up in the store
+    assert _store_files(store) == []
+
+
+def test_mirror_skips_stored_wheel(tmp_path, index_server):
+    url, requests = index_server
+    store = tmp_path.joinpath("store")
+    mirror = WheelMirror(store, jobs = 2)
+
+    mirror.mirror_conandata(_entries(url, WHEEL_SHA256))
+    assert len(requests) == 1
+    mirrored = mirror.mirror_conandata(_entries(url, WHEEL_SHA256))
+    assert len(requests) == 1
+    assert mirrored[0][1]["Any"]["3.0"]["url"] == mirror.url(WHEEL_SHA256, WHEEL_NAME)
+    assert mirrored[0][1]["Any"]["3.0"]["url"].startswith(store.absolute().as_uri())
+
+
+def test_merge_mirrors_existing_releases(tmp_path, index_server):
+    pytest.importorskip("docopt")
+    import yaml
+
+    from create_pypi_conandata import main
+    from pypi_client import PyPIClient
+
+    url, _ = index_server
+    base_url = url.rsplit("/packages/", 1)[0]
+    served = tmp_path.joinpath("served")
+
+    # The new 1.1.0 release is listed in the index, the 1.0.0 release is already in the conandata.yml
+    new_name = "example-1.1.0-py3-none-any.whl"
+    new_content = WHEEL_CONTENT[::-1]
+    new_sha256 = hashlib.sha256(new_content).hexdigest()
+    served.joinpath("packages", new_name).write_bytes(new_content)
+    served.joinpath("pypi", "example").mkdir(parents = True)
+    served.joinpath("pypi", "example", "json").write_text(json.dumps({"releases": {"1.1.0": [
+        {"packagetype": "bdist_wheel", "filename": new_name, "url": f"{base_url}/packages/{new_name}",
+         "digests": {"sha256": new_sha256}}]}}))
+    location = tmp_path.joinpath("recipes")
+    location.joinpath("example").mkdir(parents = True)
+    with open(location.joinpath("example", "conandata.yml"), "w") as f:
+        yaml.safe_dump({"sources": dict(_entries(url, WHEEL_SHA256))}, f)
+
+    store = tmp_path.joinpath("store")
+    client = PyPIClient(index_url = f"{base_url}/pypi", cache_dir = tmp_path.joinpath("cache"), jobs = 2)
+    mirror = WheelMirror(store, base_url = "https://mirror.example/wheels", jobs = 2)
+    main(names = ["example"], location = str(location), client = client, stream = False, specifier = None, latest = None,
+         pre = False, merge = True, mirror = mirror)
+
+    with open(location.joinpath("example", "conandata.yml"), "r") as f:
+        sources = yaml.safe_load(f)["sources"]
+    assert sources == {
+        "1.0.0": {"Any": {"3.0": {"url": mirror.url(WHEEL_SHA256, WHEEL_NAME), "sha256": WHEEL_SHA256}}},
+        "1.1.0": {"Any": {"3.0": {"url": mirror.url(new_sha256, new_name), "sha256": new_sha256}}},
+    }
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from benchmark_wheels import DEFAULT_DOCUMENT, build_conandata
+from wheels import WheelIndex, parse_wheel_filename, platform_os_arch
+
+
+def test_parse_wheel_filename():
+    tags = parse_wheel_filename("numpy-2.3.0-cp312-cp312-win_amd64.whl")
+    assert tags.name == "numpy"
+    assert tags.version == "2.3.0"
+    assert tags.build is None
+    assert tags.python_tags == ("cp312",)
+    assert tags.abi_tags == ("cp312",)
+    assert tags.platform_tags == ("win_amd64",)
+
+
+def test_parse_wheel_filename_build_tag():
+    tags = parse_wheel_filename("PyQt6-6.5.0-1-cp37-abi3-manylinux_2_28_x86_64.whl")
+    assert tags.build == "1"
+    assert tags.abi_tags == ("abi3",)
+
+
+def test_parse_wheel_filename_compressed_tags():
+    tags = parse_wheel_filename("numpy-2.3.0-cp312-cp312-manylinux_2_27_x86_64.manylinux_2_28_x86_64.whl")
+    assert tags.platform_tags == ("manylinux_2_27_x86_64", "manylinux_2_28_x86_64")
+
+    tags = parse_wheel_filename("six-1.16.0-py2.py3-none-any.whl")
+    assert tags.python_tags == ("py2", "py3")
+    assert tags.abi_tags == ("none",)
+    assert tags.platform_tags == ("any",)
+
+
+def test_parse_wheel_filename_invalid():
+    with pytest.raises(ValueError):
+        parse_wheel_filename("numpy-2.3.0.whl")
+
+
+@pytest.mark.parametrize("platform_tag, os_arch", [
+    ("any", ("Any", "any")),
+    ("manylinux1_x86_64", ("Linux", "x86_64")),
+    ("manylinux2014_aarch64", ("Linux", "aarch64")),
+    ("manylinux_2_17_x86_64", ("Linux", "x86_64")),
+    ("macosx_10_9_x86_64", ("Darwin", "x86_64")),
+    ("macosx_11_0_universal2", ("Darwin", "universal2")),
+    ("win_amd64", ("Windows", "amd64")),
+    ("win_arm64", ("Windows", "arm64")),
+    ("win32", ("Windows", "x86")),
+    ("musllinux_1_1_x86_64", None),
+    ("musllinux_1_2_aarch64", None),
+    ("linux_x86_64", None),
+])
+def test_platform_os_arch(platform_tag, os_arch):
+    assert platform_os_arch(platform_tag) == os_arch
+
+
+def test_index_compressed_platform_tags():
+    index = WheelIndex()
+    index.add("2.3.0", "numpy-2.3.0-cp312-cp312-manylinux_2_27_x86_64.manylinux_2_28_x86_64.whl", "url", "sha256")
+    assert index.conandata() == {"2.3.0": {"Linux": {"3.12": {"url": "url", "sha256": "sha256"}}}}
+
+
+def test_index_skips_musllinux_win32_and_free_threaded_wheels():
+    index = WheelIndex()
+    index.add("2.3.0", "numpy-2.3.0-cp312-cp312-musllinux_1_2_x86_64.whl", "musl", "sha256")
+    index.add("2.3.0", "numpy-2.3.0-cp312-cp312-win32.whl", "win32", "sha256")
+    index.add("2.3.0", "numpy-2.3.0-cp313-cp313t-manylinux_2_28_x86_64.whl", "free-threaded", "sha256")
+    assert index.conandata() == {}
+
+
+def test_recorded_document():
+    with open(DEFAULT_DOCUMENT, "rb") as f:
+        releases = json.load(f)["releases"]
+    conandata = build_conandata(releases)
+
+    assert set(conandata) == set(releases)
+    for by_os in conandata.values():
+        assert set(by_os) == {"Linux", "Darwin", "Windows"}
+        for by_python_version in by_os.values():
+            for source in by_python_version.values():
+                tags = parse_wheel_filename(source["url"].rsplit("/", 1)[1])
+                assert not any(platform_tag.startswith("musllinux") for platform_tag in tags.platform_tags)
+                assert "win32" not in tags.platform_tags
+                assert not any(abi_tag.endswith("t") for abi_tag in tags.abi_tags)